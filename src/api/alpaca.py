@@ -4,18 +4,105 @@ Prometheus Trading Bot - Alpaca API Client
 Handles communication with Alpaca Markets API for trading and market data
 """
 
+import asyncio
+import copy
+import functools
 import os
+import random
 import time
-from datetime import datetime
-from typing import Dict, List, Optional, Union
+from collections import defaultdict, deque
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, DefaultDict, Deque, Dict, List, Literal, Optional, Tuple, Type, TypeVar, Union, cast
 
-import alpaca_trade_api as tradeapi
+import aiohttp
+import numpy as np
+import orjson
 import pandas as pd
 from dotenv import load_dotenv
 
+from src.utils import logging as log
+from src.utils.timeframe import lookback_start
+
+try:
+    import httpx
+except ImportError:  # Optional HTTP/2 transport
+    httpx = None
+
 # Load environment variables if present
 load_dotenv()
 
+# Responses worth retrying: throttled, or a transient server-side failure
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_DELAY_BASE = 0.1  # Seconds; doubled on each attempt
+
+MAX_BARS_PER_REQUEST = 10000  # Alpaca's maximum page size for bars
+
+
+def _to_float(value: Optional[str], default: Optional[float] = None) -> Optional[float]:
+    """Parse an optional numeric string from an API response"""
+    return float(value) if value else default
+
+
+def _order_to_dict(order: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert an order payload to the client's order dictionary"""
+    return {
+        "id": order["id"],
+        "client_order_id": order["client_order_id"],
+        "symbol": order["symbol"],
+        "side": order["side"],
+        "type": order["type"],
+        "status": order["status"],
+        "filled_qty": _to_float(order.get("filled_qty"), 0),
+        "filled_avg_price": _to_float(order.get("filled_avg_price")),
+        "limit_price": _to_float(order.get("limit_price")),
+        "stop_price": _to_float(order.get("stop_price")),
+        "created_at": order.get("created_at"),
+        "updated_at": order.get("updated_at")
+    }
+
+
+def _parse_timestamps(timestamps: List[str]) -> np.ndarray:
+    """
+    Parse RFC 3339 timestamps from the data API into naive UTC datetime64[ns]
+    
+    NumPy parses ISO 8601 natively in C but not zone designators, so the
+    trailing "Z" Alpaca uses is stripped. Timestamps with explicit offsets go
+    through pandas instead.
+    """
+    naive = [t[:-1] for t in timestamps if t[-1:] == "Z"]
+    if len(naive) != len(timestamps):
+        return pd.to_datetime(timestamps, utc=True).tz_convert(None).to_numpy(dtype="datetime64[ns]")
+    return np.array(naive, dtype="datetime64[ns]")
+
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+def alpaca_call(default: Any, action: str) -> Callable[[F], F]:
+    """
+    Decorate an AlpacaClient coroutine to log failures and return a default
+    
+    Rate limiting, concurrency and retries are applied per HTTP request in
+    AlpacaClient._request, so paginated calls are throttled page by page and an
+    order is never resubmitted by retrying the whole method.
+    
+    Args:
+        default: Value returned (as a fresh copy) when the call raises
+        action: Description used in the error message, e.g. "getting account"
+    """
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            try:
+                return await func(self, *args, **kwargs)
+            except Exception as e:
+                log.error(f"Error {action}: {e}")
+                return copy.copy(default)
+        return cast(F, wrapper)
+    return decorator
+
+
 class AlpacaClient:
     """
     Client for interacting with the Alpaca Markets API
@@ -26,7 +113,14 @@ class AlpacaClient:
         api_key: Optional[str] = None, 
         api_secret: Optional[str] = None, 
         paper: bool = True,
-        base_url: Optional[str] = None
+        base_url: Optional[str] = None,
+        rate_limit: int = 200,
+        rate_limit_period: float = 60.0,
+        clock_ttl: float = 30.0,
+        calendar_cache_file: Optional[Union[str, Path]] = 'cache/alpaca_calendar.json',
+        max_concurrency: int = 64,
+        max_retries: int = 5,
+        transport: Literal["aiohttp", "httpx"] = "aiohttp"
     ):
         """
         Initialize the Alpaca API client
@@ -36,6 +130,14 @@ class AlpacaClient:
             api_secret: Alpaca API secret (falls back to ALPACA_API_SECRET env var)
             paper: Whether to use paper trading
             base_url: Override the API base URL
+            rate_limit: Maximum number of requests allowed per rate limit period
+            rate_limit_period: Length of the rate limit window in seconds
+            clock_ttl: Seconds to reuse a fetched market clock before requesting it again
+            calendar_cache_file: JSON file used to persist market calendar days (None disables)
+            max_concurrency: Maximum number of HTTP requests in flight at once
+            max_retries: Maximum attempts per request on throttling or transient errors
+            transport: "aiohttp" (HTTP/1.1 connection pool) or "httpx" (HTTP/2, multiplexes
+                concurrent requests over one connection per host; needs httpx[http2])
         """
         # Use provided credentials or get from environment
         self.api_key = api_key or os.getenv('ALPACA_API_KEY')
@@ -54,28 +156,171 @@ class AlpacaClient:
         self.base_url = base_url
         self.data_url = "https://data.alpaca.markets"
         
-        # Initialize API client
-        self.api = tradeapi.REST(
-            key_id=self.api_key,
-            secret_key=self.api_secret,
-            base_url=self.base_url,
-            api_version='v2'
-        )
+        if transport not in ("aiohttp", "httpx"):
+            raise ValueError(f"Unknown transport: {transport}")
+        if transport == "httpx" and httpx is None:
+            raise ImportError("httpx is required for the HTTP/2 transport")
+        self.transport = transport
+        
+        # HTTP session is created lazily by connect() so it binds to the running loop
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._client: Optional["httpx.AsyncClient"] = None
+        
+        # Track API rate limits (Alpaca allows 200 requests per minute)
+        self.rate_limit = rate_limit
+        self.rate_limit_period = rate_limit_period
+        self._request_times: Deque[float] = deque()  # Monotonic send times inside the current window
         
-        # Track API rate limits
-        self.last_request_time = 0
-        self.min_request_interval = 0.2  # 200ms minimum between requests
+        # Cap in-flight requests so wide fan-outs queue instead of opening more sockets
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        
+        # Market clock only changes state at open/close, so reuse it for a short TTL
+        self.clock_ttl = clock_ttl
+        self._clock_cache: Optional[Tuple[float, Dict]] = None
+        
+        # Calendar days never change once published; covered range is persisted to disk
+        self.calendar_cache_file = Path(calendar_cache_file) if calendar_cache_file else None
+        self._calendar_cache: Optional[Dict[str, Any]] = None
+        
+        # Trailing bar history per (symbol, timeframe) for get_bars_incremental
+        self._bars: Dict[Tuple[str, str], pd.DataFrame] = {}
     
     async def _rate_limit(self):
-        """Apply rate limiting to API requests"""
-        now = time.time()
-        elapsed = now - self.last_request_time
+        """
+        Apply rate limiting to API requests
+        
+        Uses a rolling-window token bucket, so bursts of concurrent requests go out
+        immediately until the window is full and only then wait for the oldest to expire
+        """
+        while True:
+            now = time.monotonic()
+            
+            # Drop requests that have left the window
+            while self._request_times and now - self._request_times[0] >= self.rate_limit_period:
+                self._request_times.popleft()
+            
+            if len(self._request_times) < self.rate_limit:
+                self._request_times.append(now)
+                return
+            
+            await asyncio.sleep(self._request_times[0] + self.rate_limit_period - now)
+    
+    async def connect(self):
+        """Open the persistent HTTP session used for all API requests"""
+        headers = {
+            "APCA-API-KEY-ID": self.api_key,
+            "APCA-API-SECRET-KEY": self.api_secret
+        }
+        
+        if self.transport == "httpx":
+            if self._client is None or self._client.is_closed:
+                # URLs are absolute since trading and market data live on different hosts
+                self._client = httpx.AsyncClient(
+                    http2=True,
+                    headers=headers,
+                    timeout=10.0,
+                    limits=httpx.Limits(
+                        max_connections=self.max_concurrency,
+                        max_keepalive_connections=self.max_concurrency // 2,
+                        keepalive_expiry=75
+                    )
+                )
+            return
+        
+        if self._session is not None and not self._session.closed:
+            return
+        
+        # Pool sized to the in-flight cap; DNS answers and idle TLS connections are
+        # kept between polls so a trading cycle doesn't pay for lookups or handshakes
+        self._session = aiohttp.ClientSession(
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=10),
+            connector=aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=self.max_concurrency,
+                ttl_dns_cache=300,
+                keepalive_timeout=75
+            )
+        )
+    
+    async def close(self):
+        """Close the HTTP session and release pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+    
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """
+        Issue an HTTP request over the shared session or HTTP/2 client
+        
+        Throttled (429) responses are retried with jittered exponential backoff.
+        Server errors and connection failures are retried too, except for POSTs,
+        where a retry could submit the same order twice.
+        
+        Args:
+            method: HTTP method
+            url: Absolute request URL
+            params: Query string parameters
+            json: JSON request body
+            
+        Returns:
+            Decoded JSON response body
+        """
+        await self.connect()
+        idempotent = method != "POST"
+        
+        connection_errors: Tuple[Type[BaseException], ...]
+        if self.transport == "httpx":
+            connection_errors = (httpx.TransportError,)
+        else:
+            connection_errors = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+        
+        # Encode once up front; orjson is much faster than the stdlib encoder aiohttp uses
+        data, headers = None, None
+        if json is not None:
+            data = orjson.dumps(json)
+            headers = {"Content-Type": "application/json"}
         
-        if elapsed < self.min_request_interval:
-            await time.sleep(self.min_request_interval - elapsed)
+        for attempt in range(self.max_retries):
+            last_attempt = attempt == self.max_retries - 1
+            await self._rate_limit()
             
-        self.last_request_time = time.time()
+            try:
+                async with self._semaphore:
+                    if self.transport == "httpx":
+                        assert self._client is not None  # Opened by connect()
+                        r = await self._client.request(method, url, params=params, content=data, headers=headers)
+                        retriable = r.status_code == 429 or (idempotent and r.status_code in RETRY_STATUSES)
+                        if not retriable or last_attempt:
+                            r.raise_for_status()
+                            return orjson.loads(r.content)
+                    else:
+                        assert self._session is not None  # Opened by connect()
+                        async with self._session.request(method, url, params=params, data=data, headers=headers) as r:
+                            retriable = r.status == 429 or (idempotent and r.status in RETRY_STATUSES)
+                            if not retriable or last_attempt:
+                                r.raise_for_status()
+                                return orjson.loads(await r.read())
+            except connection_errors:
+                if not idempotent or last_attempt:
+                    raise
+            
+            # Back off outside the semaphore so waiting retries don't hold a slot
+            await asyncio.sleep(RETRY_DELAY_BASE * 2 ** attempt + random.random() * RETRY_DELAY_BASE)
     
+    @alpaca_call({}, "getting account")
     async def get_account(self) -> Dict:
         """
         Get account information
@@ -83,51 +328,126 @@ class AlpacaClient:
         Returns:
             Dictionary with account details
         """
-        await self._rate_limit()
-        
-        try:
-            account = self.api.get_account()
-            return {
-                "id": account.id,
-                "status": account.status,
-                "equity": float(account.equity),
-                "cash": float(account.cash),
-                "buying_power": float(account.buying_power),
-                "long_market_value": float(account.long_market_value),
-                "short_market_value": float(account.short_market_value),
-                "initial_margin": float(account.initial_margin),
-                "last_equity": float(account.last_equity),
-                "last_maintenance_margin": float(account.last_maintenance_margin),
-                "multiplier": account.multiplier,
-                "currency": account.currency
-            }
-        except Exception as e:
-            print(f"Error getting account: {e}")
-            return {}
+        account = await self._request("GET", f"{self.base_url}/v2/account")
+        return {
+            "id": account["id"],
+            "status": account["status"],
+            "equity": float(account["equity"]),
+            "cash": float(account["cash"]),
+            "buying_power": float(account["buying_power"]),
+            "long_market_value": float(account["long_market_value"]),
+            "short_market_value": float(account["short_market_value"]),
+            "initial_margin": float(account["initial_margin"]),
+            "last_equity": float(account["last_equity"]),
+            "last_maintenance_margin": float(account["last_maintenance_margin"]),
+            "multiplier": account["multiplier"],
+            "currency": account["currency"]
+        }
     
+    @alpaca_call({"is_open": False}, "getting clock")
     async def get_clock(self) -> Dict:
         """
         Get market clock
         
+        Results are cached for clock_ttl seconds
+        
         Returns:
             Dictionary with clock details
         """
-        await self._rate_limit()
-        
-        try:
-            clock = self.api.get_clock()
-            return {
-                "timestamp": clock.timestamp.isoformat(),
-                "is_open": clock.is_open,
-                "next_open": clock.next_open.isoformat() if clock.next_open else None,
-                "next_close": clock.next_close.isoformat() if clock.next_close else None
-            }
-        except Exception as e:
-            print(f"Error getting clock: {e}")
-            return {
-                "is_open": False
+        if self._clock_cache and time.monotonic() - self._clock_cache[0] < self.clock_ttl:
+            return self._clock_cache[1]
+        
+        clock = await self._request("GET", f"{self.base_url}/v2/clock")
+        result = {
+            "timestamp": clock["timestamp"],
+            "is_open": clock["is_open"],
+            "next_open": clock.get("next_open"),
+            "next_close": clock.get("next_close")
+        }
+        self._clock_cache = (time.monotonic(), result)
+        return result
+    
+    @alpaca_call([], "getting calendar")
+    async def get_calendar(self, start: str, end: str) -> List[Dict]:
+        """
+        Get market calendar days between two dates (inclusive)
+        
+        Days already covered by the local calendar cache are served from disk;
+        only the uncovered prefix and suffix of the range are requested.
+        
+        Args:
+            start: Start date in ISO format (YYYY-MM-DD)
+            end: End date in ISO format (YYYY-MM-DD)
+            
+        Returns:
+            List of calendar day dictionaries (date, open, close) ordered by date
+        """
+        start_day = date.fromisoformat(start[:10])
+        end_day = date.fromisoformat(end[:10])
+        
+        cache = self._load_calendar_cache()
+        
+        if cache is None:
+            days = await self._fetch_calendar(start_day, end_day)
+            cache = {"start": start_day.isoformat(), "end": end_day.isoformat(), "days": {}}
+            self._merge_calendar_days(cache, days)
+            self._save_calendar_cache(cache)
+        else:
+            cached_start = date.fromisoformat(cache["start"])
+            cached_end = date.fromisoformat(cache["end"])
+            
+            if start_day < cached_start:
+                days = await self._fetch_calendar(start_day, cached_start - timedelta(days=1))
+                self._merge_calendar_days(cache, days)
+                cache["start"] = start_day.isoformat()
+            
+            if end_day > cached_end:
+                days = await self._fetch_calendar(cached_end + timedelta(days=1), end_day)
+                self._merge_calendar_days(cache, days)
+                cache["end"] = end_day.isoformat()
+            
+            if start_day < cached_start or end_day > cached_end:
+                self._save_calendar_cache(cache)
+        
+        start_key, end_key = start_day.isoformat(), end_day.isoformat()
+        return [day for key, day in sorted(cache["days"].items()) if start_key <= key <= end_key]
+    
+    async def _fetch_calendar(self, start: date, end: date) -> List[Dict]:
+        """Request calendar days for a date range from the API"""
+        return await self._request(
+            "GET",
+            f"{self.base_url}/v2/calendar",
+            params={"start": start.isoformat(), "end": end.isoformat()}
+        )
+    
+    def _merge_calendar_days(self, cache: Dict[str, Any], days: List[Dict]):
+        """Merge fetched calendar days into the cache"""
+        for day in days:
+            cache["days"][day["date"]] = {
+                "date": day["date"],
+                "open": day["open"],
+                "close": day["close"]
             }
     
+    def _save_calendar_cache(self, cache: Dict[str, Any]):
+        """Keep the calendar cache in memory and persist it to disk"""
+        self._calendar_cache = cache
+        
+        if self.calendar_cache_file:
+            self.calendar_cache_file.parent.mkdir(parents=True, exist_ok=True)
+            self.calendar_cache_file.write_bytes(orjson.dumps(cache))
+    
+    def _load_calendar_cache(self) -> Optional[Dict[str, Any]]:
+        """Get the calendar cache, reading it from disk on first use"""
+        if self._calendar_cache is None and self.calendar_cache_file and self.calendar_cache_file.exists():
+            try:
+                self._calendar_cache = orjson.loads(self.calendar_cache_file.read_bytes())
+            except (OSError, ValueError) as e:
+                log.warning(f"Ignoring unreadable calendar cache {self.calendar_cache_file}: {e}")
+        
+        return self._calendar_cache
+    
+    @alpaca_call([], "listing positions")
     async def list_positions(self) -> List[Dict]:
         """
         Get all open positions
@@ -135,27 +455,24 @@ class AlpacaClient:
         Returns:
             List of position dictionaries
         """
-        await self._rate_limit()
-        
-        try:
-            positions = self.api.list_positions()
-            return [{
-                "symbol": p.symbol,
-                "qty": int(p.qty),
-                "side": "long" if int(p.qty) > 0 else "short",
-                "avg_entry_price": float(p.avg_entry_price),
-                "market_value": float(p.market_value),
-                "cost_basis": float(p.cost_basis),
-                "unrealized_pl": float(p.unrealized_pl),
-                "unrealized_plpc": float(p.unrealized_plpc),
-                "current_price": float(p.current_price),
-                "lastday_price": float(p.lastday_price),
-                "change_today": float(p.change_today)
-            } for p in positions]
-        except Exception as e:
-            print(f"Error listing positions: {e}")
-            return []
+        positions = await self._request("GET", f"{self.base_url}/v2/positions")
+        
+        # Parse qty once; it can be fractional, so int() would raise
+        return [{
+            "symbol": p["symbol"],
+            "qty": qty,
+            "side": "long" if qty > 0 else "short",
+            "avg_entry_price": float(p["avg_entry_price"]),
+            "market_value": float(p["market_value"]),
+            "cost_basis": float(p["cost_basis"]),
+            "unrealized_pl": float(p["unrealized_pl"]),
+            "unrealized_plpc": float(p["unrealized_plpc"]),
+            "current_price": float(p["current_price"]),
+            "lastday_price": float(p["lastday_price"]),
+            "change_today": float(p["change_today"])
+        } for p in positions for qty in (float(p["qty"]),)]
     
+    @alpaca_call({}, "getting bars")
     async def get_bars(
         self,
         symbols: List[str],
@@ -170,62 +487,202 @@ class AlpacaClient:
         Args:
             symbols: List of symbols to get data for
             timeframe: Bar timeframe (1Min, 5Min, 15Min, 1H, 1D)
-            limit: Maximum number of bars to retrieve
-            start: Start time in ISO format
+            limit: Maximum number of bars to retrieve per symbol
+            start: Start time in ISO format (defaults to a window covering limit bars)
             end: End time in ISO format
             
         Returns:
             Dictionary of DataFrames keyed by symbol
         """
-        await self._rate_limit()
+        columns = await self._fetch_bar_columns(symbols, timeframe, limit, start, end)
         
-        try:
-            # Build request parameters
-            params = {
-                "timeframe": timeframe,
-                "limit": limit
-            }
-            
-            if start:
-                params["start"] = start
+        # Convert to DataFrames from the typed arrays; float32 is ample for OHLC
+        # prices and halves the bytes strategies stream through
+        result = {}
+        for symbol, cols in columns.items():
+            result[symbol] = pd.DataFrame(
+                {
+                    "open": cols["open"].astype(np.float32),
+                    "high": cols["high"].astype(np.float32),
+                    "low": cols["low"].astype(np.float32),
+                    "close": cols["close"].astype(np.float32),
+                    "volume": cols["volume"]
+                },
+                index=pd.DatetimeIndex(cols["timestamp"], name="timestamp").tz_localize("UTC")
+            )
+        
+        return result
+    
+    @alpaca_call({}, "getting bars")
+    async def get_bars_arrays(
+        self,
+        symbols: List[str],
+        timeframe: str = "1Min",
+        limit: int = 100,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Get historical bar data for multiple symbols as NumPy column arrays
+        
+        Same request as get_bars, without building DataFrames. Use this when the
+        bars are consumed as arrays anyway.
+        
+        Args:
+            symbols: List of symbols to get data for
+            timeframe: Bar timeframe (1Min, 5Min, 15Min, 1H, 1D)
+            limit: Maximum number of bars to retrieve per symbol
+            start: Start time in ISO format (defaults to a window covering limit bars)
+            end: End time in ISO format
             
-            if end:
-                params["end"] = end
+        Returns:
+            Dictionary keyed by symbol of column arrays: timestamp (naive UTC
+            datetime64[ns]), open, high, low, close (float64) and volume (int64)
+        """
+        return await self._fetch_bar_columns(symbols, timeframe, limit, start, end)
+    
+    async def _fetch_bar_columns(
+        self,
+        symbols: List[str],
+        timeframe: str,
+        limit: int,
+        start: Optional[str],
+        end: Optional[str],
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Fetch bars for symbols and return per-symbol column arrays, skipping empty symbols
+        
+        The API's limit is a page size shared by every symbol in the request, and
+        multi-symbol pages are ordered by symbol and then by time. So the window is
+        bounded by a start derived from limit unless one is given, every page is
+        followed (stopping at a per-symbol count would keep the oldest bars of the
+        last symbol), and the newest limit bars of each symbol are kept.
+        
+        Args:
+            symbols: List of symbols to get data for
+            timeframe: Bar timeframe
+            limit: Maximum number of bars to keep per symbol
+            start: Start time in ISO format
+            end: End time in ISO format
             
-            # Make API request
-            bars = self.api.get_bars(symbols, **params)
+        Returns:
+            Dictionary keyed by symbol of column arrays
+        """
+        start = start or lookback_start(timeframe, limit, end)
+        
+        # Build request parameters
+        params = {
+            "symbols": ",".join(symbols),
+            "timeframe": timeframe,
+            "limit": min(MAX_BARS_PER_REQUEST, limit * len(symbols))
+        }
+        
+        if start:
+            params["start"] = start
+        
+        if end:
+            params["end"] = end
+        
+        # Fetch all symbols in one request, following every page token.
+        # Bars are bucketed straight into per-symbol column lists in a single pass.
+        columns: DefaultDict[str, Dict[str, List[Any]]] = defaultdict(lambda: {
+            "timestamp": [], "open": [], "high": [], "low": [], "close": [], "volume": []
+        })
+        while True:
+            page = await self._request("GET", f"{self.data_url}/v2/stocks/bars", params=params)
             
-            # Process the results
-            result = {}
-            for symbol in symbols:
-                # Filter bars for this symbol
-                symbol_bars = [b for b in bars if b.symbol == symbol]
-                
-                if not symbol_bars:
-                    continue
-                
-                # Convert to DataFrame
-                df = pd.DataFrame([{
-                    "timestamp": b.t,
-                    "open": float(b.o),
-                    "high": float(b.h),
-                    "low": float(b.l),
-                    "close": float(b.c),
-                    "volume": int(b.v)
-                } for b in symbol_bars])
+            for symbol, symbol_bars in (page.get("bars") or {}).items():
+                cols = columns[symbol]
+                timestamps, opens, highs = cols["timestamp"], cols["open"], cols["high"]
+                lows, closes, volumes = cols["low"], cols["close"], cols["volume"]
                 
-                # Set timestamp as index
-                if not df.empty:
-                    df["timestamp"] = pd.to_datetime(df["timestamp"])
-                    df = df.set_index("timestamp")
-                    result[symbol] = df
+                for b in symbol_bars:
+                    timestamps.append(b["t"])
+                    opens.append(b["o"])
+                    highs.append(b["h"])
+                    lows.append(b["l"])
+                    closes.append(b["c"])
+                    volumes.append(b["v"])
             
-            return result
+            page_token = page.get("next_page_token")
+            if not page_token:
+                break
+            params["page_token"] = page_token
         
-        except Exception as e:
-            print(f"Error getting bars: {e}")
-            return {}
+        # Bars arrive oldest first, so the newest limit bars are the tail of each list
+        return {
+            symbol: {
+                "timestamp": _parse_timestamps(cols["timestamp"][-limit:]),
+                "open": np.asarray(cols["open"][-limit:], dtype=np.float64),
+                "high": np.asarray(cols["high"][-limit:], dtype=np.float64),
+                "low": np.asarray(cols["low"][-limit:], dtype=np.float64),
+                "close": np.asarray(cols["close"][-limit:], dtype=np.float64),
+                "volume": np.asarray(cols["volume"][-limit:], dtype=np.int64)
+            }
+            for symbol, cols in columns.items()
+            if cols["timestamp"]
+        }
+    
+    async def get_bars_incremental(
+        self,
+        symbols: List[str],
+        timeframe: str = "1Min",
+        lookback: int = 100
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Get the trailing bars for symbols, downloading only what is new
+        
+        The first call for a symbol fetches the full lookback. Later calls request
+        bars from the last cached timestamp onwards and merge them in, so a tick
+        usually transfers one or two bars instead of the whole history. The last
+        cached bar is fetched again so a bar that was still forming gets replaced.
+        
+        Args:
+            symbols: List of symbols to get data for
+            timeframe: Bar timeframe (1Min, 5Min, 15Min, 1H, 1D)
+            lookback: Number of trailing bars to keep and return per symbol
+            
+        Returns:
+            Dictionary of DataFrames keyed by symbol
+        """
+        result = {}
+        cold = []
+        warm = {}
+        for symbol in symbols:
+            cached = self._bars.get((symbol, timeframe))
+            if cached is None:
+                cold.append(symbol)
+            else:
+                warm[symbol] = cached
+        
+        if warm:
+            # One request for all cached symbols, starting at the oldest last bar among them
+            # but never before the lookback window, with a per-symbol budget of lookback bars
+            since = min(df.index[-1] for df in warm.values())
+            window_start = lookback_start(timeframe, lookback)
+            if window_start:
+                since = max(since, pd.Timestamp(window_start))
+            fresh = await self.get_bars(
+                list(warm), timeframe, limit=lookback, start=since.isoformat()
+            )
+            
+            for symbol, cached in warm.items():
+                new = fresh.get(symbol)
+                if new is not None and not new.empty:
+                    # New rows supersede any cached rows they overlap
+                    cached = pd.concat([cached[cached.index < new.index[0]], new]).iloc[-lookback:]
+                    self._bars[(symbol, timeframe)] = cached
+                result[symbol] = cached
+        
+        if cold:
+            fetched = await self.get_bars(cold, timeframe, limit=lookback)
+            for symbol, bars in fetched.items():
+                self._bars[(symbol, timeframe)] = bars
+                result[symbol] = bars
+        
+        return result
     
+    @alpaca_call({}, "creating order")
     async def create_order(
         self,
         symbol: str,
@@ -237,6 +694,9 @@ class AlpacaClient:
         stop_price: Optional[float] = None,
         client_order_id: Optional[str] = None,
         extended_hours: bool = False,
+        order_class: Optional[str] = None,
+        stop_loss: Optional[Dict[str, float]] = None,
+        take_profit: Optional[Dict[str, float]] = None,
     ) -> Dict:
         """
         Create a new order
@@ -251,55 +711,47 @@ class AlpacaClient:
             stop_price: Stop price for stop and stop-limit orders
             client_order_id: Client-specified order ID
             extended_hours: Whether to allow trading during extended hours
+            order_class: Advanced order class (simple, bracket, oco, oto)
+            stop_loss: Stop-loss leg, e.g. {"stop_price": 95.0}
+            take_profit: Take-profit leg, e.g. {"limit_price": 110.0}
             
         Returns:
             Dictionary with order details
         """
-        await self._rate_limit()
-        
-        try:
-            # Build parameters
-            params = {
-                "symbol": symbol,
-                "qty": qty,
-                "side": side,
-                "type": type,
-                "time_in_force": time_in_force,
-                "extended_hours": extended_hours
-            }
-            
-            if limit_price and (type == "limit" or type == "stop_limit"):
-                params["limit_price"] = limit_price
-                
-            if stop_price and (type == "stop" or type == "stop_limit"):
-                params["stop_price"] = stop_price
-                
-            if client_order_id:
-                params["client_order_id"] = client_order_id
+        # Build parameters
+        params = {
+            "symbol": symbol,
+            "qty": qty,
+            "side": side,
+            "type": type,
+            "time_in_force": time_in_force,
+            "extended_hours": extended_hours
+        }
+        
+        if limit_price and (type == "limit" or type == "stop_limit"):
+            params["limit_price"] = limit_price
             
-            # Submit order
-            order = self.api.submit_order(**params)
+        if stop_price and (type == "stop" or type == "stop_limit"):
+            params["stop_price"] = stop_price
             
-            # Convert to dictionary
-            return {
-                "id": order.id,
-                "client_order_id": order.client_order_id,
-                "symbol": order.symbol,
-                "side": order.side,
-                "type": order.type,
-                "status": order.status,
-                "filled_qty": float(order.filled_qty) if order.filled_qty else 0,
-                "filled_avg_price": float(order.filled_avg_price) if order.filled_avg_price else None,
-                "limit_price": float(order.limit_price) if order.limit_price else None,
-                "stop_price": float(order.stop_price) if order.stop_price else None,
-                "created_at": order.created_at.isoformat() if order.created_at else None,
-                "updated_at": order.updated_at.isoformat() if order.updated_at else None
-            }
+        if client_order_id:
+            params["client_order_id"] = client_order_id
+        
+        # Attached legs are placed by the server together with the entry order
+        if order_class:
+            params["order_class"] = order_class
+        if stop_loss:
+            params["stop_loss"] = stop_loss
+        if take_profit:
+            params["take_profit"] = take_profit
+        
+        # Submit order
+        order = await self._request("POST", f"{self.base_url}/v2/orders", json=params)
         
-        except Exception as e:
-            print(f"Error creating order: {e}")
-            return {}
+        # Convert to dictionary
+        return _order_to_dict(order)
     
+    @alpaca_call([], "getting orders")
     async def get_orders(self, status: str = "open") -> List[Dict]:
         """
         Get orders
@@ -310,30 +762,11 @@ class AlpacaClient:
         Returns:
             List of order dictionaries
         """
-        await self._rate_limit()
+        orders = await self._request("GET", f"{self.base_url}/v2/orders", params={"status": status})
         
-        try:
-            orders = self.api.list_orders(status=status)
-            
-            return [{
-                "id": o.id,
-                "client_order_id": o.client_order_id,
-                "symbol": o.symbol,
-                "side": o.side,
-                "type": o.type,
-                "status": o.status,
-                "filled_qty": float(o.filled_qty) if o.filled_qty else 0,
-                "filled_avg_price": float(o.filled_avg_price) if o.filled_avg_price else None,
-                "limit_price": float(o.limit_price) if o.limit_price else None,
-                "stop_price": float(o.stop_price) if o.stop_price else None,
-                "created_at": o.created_at.isoformat() if o.created_at else None,
-                "updated_at": o.updated_at.isoformat() if o.updated_at else None
-            } for o in orders]
-        
-        except Exception as e:
-            print(f"Error getting orders: {e}")
-            return []
+        return [_order_to_dict(o) for o in orders]
     
+    @alpaca_call({}, "closing position")
     async def close_position(self, symbol: str) -> Dict:
         """
         Close a position for a symbol
@@ -344,23 +777,36 @@ class AlpacaClient:
         Returns:
             Dictionary with order details
         """
-        await self._rate_limit()
+        order = await self._request("DELETE", f"{self.base_url}/v2/positions/{symbol}")
         
-        try:
-            order = self.api.close_position(symbol)
-            
-            return {
-                "id": order.id,
-                "client_order_id": order.client_order_id,
-                "symbol": order.symbol,
-                "side": order.side,
-                "type": order.type,
-                "status": order.status,
-                "filled_qty": float(order.filled_qty) if order.filled_qty else 0,
-                "filled_avg_price": float(order.filled_avg_price) if order.filled_avg_price else None,
-                "created_at": order.created_at.isoformat() if order.created_at else None
-            }
+        return {
+            "id": order["id"],
+            "client_order_id": order["client_order_id"],
+            "symbol": order["symbol"],
+            "side": order["side"],
+            "type": order["type"],
+            "status": order["status"],
+            "filled_qty": _to_float(order.get("filled_qty"), 0),
+            "filled_avg_price": _to_float(order.get("filled_avg_price")),
+            "created_at": order.get("created_at")
+        }
+    
+    async def snapshot(self) -> Dict[str, Any]:
+        """
+        Get account, clock, positions and open orders in a single concurrent fan-out
         
-        except Exception as e:
-            print(f"Error closing position: {e}")
-            return {} 
\ No newline at end of file
+        The four requests are independent, so callers should prefer this over four
+        sequential awaits; wall time is roughly one round trip instead of four.
+        
+        Returns:
+            Dictionary with "account", "clock", "positions" and "orders" keys. A call
+            that raised is reported as its exception instead of aborting the others.
+        """
+        results = await asyncio.gather(
+            self.get_account(),
+            self.get_clock(),
+            self.list_positions(),
+            self.get_orders(),
+            return_exceptions=True
+        )
+        return dict(zip(("account", "clock", "positions", "orders"), results))
@@ -0,0 +1,113 @@
+"""
+Prometheus Trading Bot - Strategy Kernels
+
+Numba-compiled array kernels used by the strategies. Numba is optional: when it
+is not installed HAVE_NUMBA is False and callers keep their NumPy code paths,
+since these loops would be far slower as plain Python.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # Optional: kernels run uncompiled and callers use NumPy instead
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# fastmath is left off: strategies rely on a NaN close propagating into the means
+
+
+@njit(cache=True)
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Simple moving average aligned with the input, NaN until the window is full
+
+    Non-finite values are kept out of the running sum and counted instead; while
+    the window holds any, its sum is taken directly, so only the windows that
+    contain them come out non-finite (as with np.convolve and bottleneck).
+
+    Args:
+        values: 1-D float64 array of prices
+        window: Moving average window
+
+    Returns:
+        float64 array the same length as values
+    """
+    n = values.shape[0]
+    result = np.empty(n)
+    total = 0.0
+    non_finite = 0
+    for i in range(n):
+        value = values[i]
+        if np.isfinite(value):
+            total += value
+        else:
+            non_finite += 1
+        if i >= window:
+            old = values[i - window]
+            if np.isfinite(old):
+                total -= old
+            else:
+                non_finite -= 1
+
+        if i < window - 1:
+            result[i] = np.nan
+        elif non_finite:
+            window_sum = 0.0
+            for j in range(i - window + 1, i + 1):
+                window_sum += values[j]
+            result[i] = window_sum / window
+        else:
+            result[i] = total / window
+    return result
+
+
+@njit(cache=True)
+def tail_averages(close: np.ndarray, short: int, long: int) -> Tuple[float, float, float, float]:
+    """
+    Previous and current short/long means from the tail of a close array
+
+    Args:
+        close: Closing prices, at least long + 1 long
+        short: Short moving average window
+        long: Long moving average window
+
+    Returns:
+        Tuple of (prev_short, prev_long, current_short, current_long)
+    """
+    n = close.shape[0]
+
+    # Previous and current windows share every bar but one at each end; summing the
+    # shared part once and adding each end (rather than subtracting the last close)
+    # keeps a NaN last close out of the previous means
+    short_body = 0.0
+    for i in range(n - short, n - 1):
+        short_body += close[i]
+    long_body = 0.0
+    for i in range(n - long, n - 1):
+        long_body += close[i]
+
+    return (
+        (short_body + close[n - short - 1]) / short,
+        (long_body + close[n - long - 1]) / long,
+        (short_body + close[n - 1]) / short,
+        (long_body + close[n - 1]) / long
+    )
+
+
+def warmup():
+    """Compile the kernels ahead of the trading loop so the first tick doesn't pay for it"""
+    if not HAVE_NUMBA:
+        return
+
+    values = np.ones(3)
+    sma(values, 2)
+    tail_averages(values, 1, 2)
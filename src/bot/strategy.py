@@ -5,12 +5,47 @@ Base class and interfaces for implementing trading strategies
 """
 
 from abc import ABC, abstractmethod
+from collections import deque
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
+from src.bot import _kernels
+from src.data.provider import Bars, as_bars
 from src.utils import logging as log
 
+try:
+    import bottleneck as bn
+except ImportError:  # Optional: C moving-window kernels, np.convolve is used otherwise
+    bn = None
+
+# Strategies take bar arrays from the data provider; DataFrames are still accepted
+MarketData = Union[Bars, pd.DataFrame]
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Simple moving average aligned with the input
+    
+    Args:
+        values: 1-D array of prices
+        window: Moving average window
+        
+    Returns:
+        Array the same length as values, NaN until the window is full
+    """
+    if bn is not None:
+        return bn.move_mean(values, window)
+    
+    if _kernels.HAVE_NUMBA:
+        return _kernels.sma(np.asarray(values, dtype=np.float64), window)
+    
+    result = np.full(len(values), np.nan)
+    if len(values) >= window:
+        result[window - 1:] = np.convolve(values, np.ones(window) / window, mode='valid')
+    return result
+
 
 class Strategy(ABC):
     """
@@ -30,13 +65,13 @@ class Strategy(ABC):
         log.info(f"Initializing strategy: {self.name}")
     
     @abstractmethod
-    async def analyze(self, symbol: str, data: pd.DataFrame) -> Dict[str, Any]:
+    async def analyze(self, symbol: str, data: MarketData) -> Dict[str, Any]:
         """
         Analyze market data and generate a trading signal
         
         Args:
             symbol: Symbol being analyzed
-            data: DataFrame with market data (OHLCV)
+            data: Bars (or DataFrame) with market data (OHLCV)
             
         Returns:
             Trading signal dictionary with action and metadata
@@ -53,20 +88,23 @@ class Strategy(ABC):
         """
         pass
     
-    async def log_analysis(self, symbol: str, data: pd.DataFrame, signal: Dict[str, Any]):
+    def log_analysis(self, symbol: str, data: MarketData, signal: Dict[str, Any]):
         """
         Log the analysis results
         
+        Synchronous: it does no I/O of its own worth suspending for
+        
         Args:
             symbol: Symbol being analyzed
-            data: DataFrame with market data
+            data: Bars (or DataFrame) with market data
             signal: Trading signal dictionary
         """
         action = signal.get("action", "UNKNOWN")
         log.info(f"Strategy {self.name} generated signal: {action} for {symbol}")
         
         metrics = signal.get("metrics", {})
-        metrics["latest_close"] = float(data['close'].iloc[-1])
+        if "latest_close" not in metrics:
+            metrics["latest_close"] = float(as_bars(data).close[-1])
         
         log.info_event("strategy_analysis", {
             "strategy": self.name,
@@ -107,6 +145,10 @@ class MAStrategy(Strategy):
         super().__init__(name)
         self.short_window = short_window
         self.long_window = long_window
+        
+        # Per-symbol running sums so each tick only folds in the bars it has not seen
+        self._state: Dict[str, Dict[str, Any]] = {}
+        
         log.info(f"MA Crossover strategy initialized with windows: {short_window}/{long_window}")
     
     def get_required_data(self) -> Dict[str, Any]:
@@ -126,36 +168,155 @@ class MAStrategy(Strategy):
             "min_required_bars": self.long_window + 1
         }
     
-    def calculate_moving_averages(self, data: pd.DataFrame) -> Optional[pd.DataFrame]:
+    def calculate_moving_averages(self, data: MarketData) -> Optional[Tuple[float, float, float, float]]:
         """
-        Calculate moving averages on price data
+        Calculate the previous and current moving averages from the price history
+        
+        Only the last long_window + 1 closes are read; no frame copy or full-length
+        MA columns are built. Use moving_average() when the whole series is needed.
         
         Args:
-            data: DataFrame with OHLCV data
+            data: Bars (or DataFrame) with OHLCV data
             
         Returns:
-            DataFrame with added MA columns or None if not enough data
+            Tuple of (prev_short, prev_long, current_short, current_long) or None if not enough data
         """
-        if data is None or len(data) < self.long_window:
-            log.warning(f"Insufficient data ({len(data) if data is not None else 0}) for MA calculation")
+        close = as_bars(data).close
+        if len(close) < self.long_window + 1:
+            log.warning(f"Insufficient data ({len(close)}) for MA calculation")
             return None
             
         try:
-            df = data.copy()
-            df['MA_short'] = df['close'].rolling(window=self.short_window).mean()
-            df['MA_long'] = df['close'].rolling(window=self.long_window).mean()
-            return df
+            return self._tail_averages(close)
         except Exception as e:
             log.error(f"Error calculating moving averages: {e}")
             return None
     
-    async def analyze(self, symbol: str, data: pd.DataFrame) -> Dict[str, Any]:
+    def _tail_averages(self, close: np.ndarray) -> Tuple[float, float, float, float]:
+        """
+        Previous and current short/long means from the tail of a close array
+        
+        Args:
+            close: Closing prices, at least long_window + 1 long
+            
+        Returns:
+            Tuple of (prev_short, prev_long, current_short, current_long)
+        """
+        short, long = self.short_window, self.long_window
+        if _kernels.HAVE_NUMBA:
+            return _kernels.tail_averages(np.asarray(close, dtype=np.float64), short, long)
+        
+        return (
+            float(close[-short - 1:-1].mean(dtype=np.float64)),
+            float(close[-long - 1:-1].mean(dtype=np.float64)),
+            float(close[-short:].mean(dtype=np.float64)),
+            float(close[-long:].mean(dtype=np.float64))
+        )
+    
+    def _new_state(self) -> Dict[str, Any]:
+        """Create empty incremental moving average state for a symbol"""
+        return {
+            "last_ts": None,
+            "last_close": None,
+            "short_buf": deque(maxlen=self.short_window),
+            "long_buf": deque(maxlen=self.long_window),
+            "short_sum": 0.0,
+            "long_sum": 0.0,
+            "prev_short_ma": None,
+            "prev_long_ma": None,
+            "current_short_ma": None,
+            "current_long_ma": None
+        }
+    
+    def _push_close(self, state: Dict[str, Any], close: float):
+        """
+        Fold one closing price into the running sums in O(1)
+        
+        Args:
+            state: Incremental state for the symbol
+            close: Closing price of the new bar
+        """
+        short_buf, long_buf = state["short_buf"], state["long_buf"]
+        
+        # Subtract the bar leaving each window before the deque drops it
+        if len(short_buf) == self.short_window:
+            state["short_sum"] -= short_buf[0]
+        if len(long_buf) == self.long_window:
+            state["long_sum"] -= long_buf[0]
+        
+        short_buf.append(close)
+        long_buf.append(close)
+        state["short_sum"] += close
+        state["long_sum"] += close
+        
+        state["prev_short_ma"] = state["current_short_ma"]
+        state["prev_long_ma"] = state["current_long_ma"]
+        state["current_short_ma"] = state["short_sum"] / self.short_window if len(short_buf) == self.short_window else None
+        state["current_long_ma"] = state["long_sum"] / self.long_window if len(long_buf) == self.long_window else None
+        state["last_close"] = close
+    
+    def _update_state(self, symbol: str, data: Bars) -> Dict[str, Any]:
+        """
+        Bring the incremental moving averages for a symbol up to date with data
+        
+        Only bars newer than the last one seen are folded in. The state is reseeded
+        from the tail of the data on first use, when the history no longer lines
+        up with what was seen (gap, revision or restart), or when a non-finite
+        close has poisoned the running sums.
+        
+        Args:
+            symbol: Symbol being analyzed
+            data: Bars sorted by timestamp
+            
+        Returns:
+            Updated state dictionary
+        """
+        closes = data.close
+        index = data.ts
+        state = self._state.get(symbol)
+        start = None
+        
+        if state is not None and state["last_ts"] is not None:
+            pos = np.searchsorted(index, state["last_ts"], side="right")
+            if pos > 0 and index[pos - 1] == state["last_ts"] and closes[pos - 1] == state["last_close"]:
+                # A NaN close never leaves a running sum, so only finite sums are reused
+                if np.isfinite(state["short_sum"]) and np.isfinite(state["long_sum"]):
+                    start = pos
+        
+        if state is None or start is None:
+            state = self._new_state()
+            self._state[symbol] = state
+            
+            if len(closes) <= self.long_window:
+                # Not enough history to fill the windows yet; fold in what there is
+                start = 0
+            else:
+                # Seed the windows and the current/previous MAs straight from the tail
+                (state["prev_short_ma"], state["prev_long_ma"],
+                 state["current_short_ma"], state["current_long_ma"]) = self._tail_averages(closes)
+                state["short_buf"].extend(closes[-self.short_window:].tolist())
+                state["long_buf"].extend(closes[-self.long_window:].tolist())
+                state["short_sum"] = sum(state["short_buf"])
+                state["long_sum"] = sum(state["long_buf"])
+                state["last_close"] = state["long_buf"][-1]
+                start = len(closes)
+        
+        for close in closes[start:].tolist():
+            self._push_close(state, close)
+        
+        state["last_ts"] = index[-1]
+        return state
+    
+    async def analyze(self, symbol: str, data: MarketData) -> Dict[str, Any]:
         """
         Analyze price data with MA crossover strategy
         
+        Moving averages are maintained incrementally per symbol, so a tick with one
+        new bar costs O(1) regardless of the window lengths
+        
         Args:
             symbol: Symbol being analyzed
-            data: DataFrame with OHLCV data
+            data: Bars (or DataFrame) with OHLCV data
             
         Returns:
             Trading signal dictionary with action and metadata
@@ -163,72 +324,143 @@ class MAStrategy(Strategy):
         # Default to no signal if anything fails
         null_signal = {"action": None}
         
-        # Calculate moving averages
-        df_with_ma = self.calculate_moving_averages(data)
-        
-        if df_with_ma is None or len(df_with_ma) < 2:
+        # Warm-up symbols bail out before any state or array work
+        data = as_bars(data)
+        if len(data.close) < self.long_window + 1:
             log.debug(f"Insufficient data for MA analysis on {symbol}")
             return null_signal
             
         try:
-            # Get current and previous MA values
-            current_short_ma = df_with_ma['MA_short'].iloc[-1]
-            current_long_ma = df_with_ma['MA_long'].iloc[-1]
-            prev_short_ma = df_with_ma['MA_short'].iloc[-2]
-            prev_long_ma = df_with_ma['MA_long'].iloc[-2]
-            
-            # Check for NaN values
-            if (pd.isna(current_short_ma) or pd.isna(current_long_ma) or 
-                pd.isna(prev_short_ma) or pd.isna(prev_long_ma)):
-                log.debug(f"NaN values in MA calculation for {symbol}")
+            # Update running moving averages with any new bars; with at least
+            # long_window + 1 bars both windows are full for the last two bars
+            state = self._update_state(symbol, data)
+            current_short_ma = state["current_short_ma"]
+            current_long_ma = state["current_long_ma"]
+            prev_short_ma = state["prev_short_ma"]
+            prev_long_ma = state["prev_long_ma"]
+            
+            # A missing close in the window poisons the averages; don't trade on them
+            if np.isnan((prev_short_ma, prev_long_ma, current_short_ma, current_long_ma)).any():
+                log.debug(f"NaN moving average for {symbol}, skipping")
                 return null_signal
-                
-            # Build metrics
-            metrics = {
-                "latest_close": float(df_with_ma['close'].iloc[-1]),
-                "current_short_ma": float(current_short_ma),
-                "current_long_ma": float(current_long_ma),
-                "prev_short_ma": float(prev_short_ma),
-                "prev_long_ma": float(prev_long_ma)
-            }
             
-            # Get the current price for signal generation
-            current_price = float(df_with_ma['close'].iloc[-1])
-            
-            # Determine signal based on crossovers
-            signal = {}
-            
-            if prev_short_ma <= prev_long_ma and current_short_ma > current_long_ma:
-                # Golden Cross - Buy Signal
-                signal = {
-                    "action": "buy",
-                    "price": current_price,
-                    "stop_loss": current_price * 0.95,  # 5% stop loss
-                    "reason": "Golden Cross (Short MA crossed above Long MA)",
-                    "metrics": metrics
-                }
-            elif prev_short_ma >= prev_long_ma and current_short_ma < current_long_ma:
-                # Death Cross - Sell Signal
-                signal = {
-                    "action": "sell",
-                    "price": current_price,
-                    "reason": "Death Cross (Short MA crossed below Long MA)",
-                    "metrics": metrics
-                }
-            else:
-                # No crossover - No signal
-                signal = {
-                    "action": None,
-                    "metrics": metrics,
-                    "reason": "No crossover detected"
-                }
+            # Build the crossover signal at the latest close
+            signal = self._build_signal(
+                state["last_close"], prev_short_ma, prev_long_ma, current_short_ma, current_long_ma
+            )
                 
             # Log analysis results if we have an actionable signal
             if signal["action"]:
-                await self.log_analysis(symbol, data, signal)
+                self.log_analysis(symbol, data, signal)
             
             return signal
             
         except Exception as e:
             log.error(f"Error in MA crossover analysis for {symbol}: {e}")
-            return null_signal 
\ No newline at end of file
+            return null_signal
+    
+    async def analyze_batch(self, frames: Dict[str, MarketData]) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze many symbols at once with the MA crossover strategy
+        
+        The last long_window + 1 closes of every frame are stacked into one matrix,
+        so the moving averages and crossover tests run as a handful of NumPy
+        operations for the whole batch instead of one Python call per symbol.
+        Unlike analyze, no per-symbol incremental state is used or updated.
+        
+        Args:
+            frames: Mapping of symbol to Bars (or DataFrame) with OHLCV data
+            
+        Returns:
+            Mapping of symbol to trading signal dictionary
+        """
+        length = self.long_window + 1
+        # A fresh dict per symbol so a caller annotating one signal can't change the rest
+        signals = {symbol: {"action": None} for symbol in frames}
+        
+        ready = [(symbol, data) for symbol, data in ((s, as_bars(d)) for s, d in frames.items())
+                 if len(data.close) >= length]
+        if not ready:
+            return signals
+            
+        try:
+            mat = np.stack([data.close[-length:] for _, data in ready]).astype(np.float64, copy=False)
+            short, long = self.short_window, self.long_window
+            prev_short = mat[:, -short - 1:-1].mean(axis=1)
+            prev_long = mat[:, -long - 1:-1].mean(axis=1)
+            current_short = mat[:, -short:].mean(axis=1)
+            current_long = mat[:, -long:].mean(axis=1)
+            
+            # A missing close in the window poisons the averages; don't trade on them
+            valid = ~np.isnan(mat).any(axis=1)
+            
+            for i in np.flatnonzero(valid):
+                symbol, data = ready[i]
+                signal = self._build_signal(
+                    float(mat[i, -1]), float(prev_short[i]), float(prev_long[i]),
+                    float(current_short[i]), float(current_long[i])
+                )
+                if signal["action"]:
+                    self.log_analysis(symbol, data, signal)
+                signals[symbol] = signal
+                
+        except Exception as e:
+            log.error(f"Error in batch MA crossover analysis: {e}")
+            
+        return signals
+    
+    def _build_signal(
+        self,
+        current_price: float,
+        prev_short_ma: float,
+        prev_long_ma: float,
+        current_short_ma: float,
+        current_long_ma: float
+    ) -> Dict[str, Any]:
+        """
+        Turn the previous and current moving averages into a crossover signal
+        
+        Args:
+            current_price: Latest closing price
+            prev_short_ma: Short MA as of the previous bar
+            prev_long_ma: Long MA as of the previous bar
+            current_short_ma: Short MA as of the latest bar
+            current_long_ma: Long MA as of the latest bar
+            
+        Returns:
+            Trading signal dictionary with action and metadata
+        """
+        # Build metrics
+        metrics = {
+            "latest_close": current_price,
+            "current_short_ma": current_short_ma,
+            "current_long_ma": current_long_ma,
+            "prev_short_ma": prev_short_ma,
+            "prev_long_ma": prev_long_ma
+        }
+        
+        # Determine signal based on crossovers
+        if prev_short_ma <= prev_long_ma and current_short_ma > current_long_ma:
+            # Golden Cross - Buy Signal
+            return {
+                "action": "buy",
+                "price": current_price,
+                "stop_loss": current_price * 0.95,  # 5% stop loss
+                "reason": "Golden Cross (Short MA crossed above Long MA)",
+                "metrics": metrics
+            }
+        elif prev_short_ma >= prev_long_ma and current_short_ma < current_long_ma:
+            # Death Cross - Sell Signal
+            return {
+                "action": "sell",
+                "price": current_price,
+                "reason": "Death Cross (Short MA crossed below Long MA)",
+                "metrics": metrics
+            }
+        
+        # No crossover - No signal
+        return {
+            "action": None,
+            "metrics": metrics,
+            "reason": "No crossover detected"
+        } 
\ No newline at end of file
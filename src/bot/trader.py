@@ -10,14 +10,19 @@ import logging
 import signal
 import sys
 import time
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
-import pandas as pd
+
+try:
+    import uvloop
+except ImportError:  # Optional: libuv event loop; not available on Windows
+    uvloop = None
 
 from src.api.alpaca import AlpacaClient
+from src.bot import _kernels
 from src.bot.strategy import Strategy
-from src.data.provider import DataProvider
+from src.data.provider import Bars, DataProvider
 from src.utils.logging import setup_logging
 
 logger = logging.getLogger(__name__)
@@ -40,6 +45,8 @@ class TradingBot:
         time_frame: str = "1Min",
         market_hours_only: bool = True,
         cooldown_period: int = 20,
+        max_concurrency: int = 16,
+        stream_bars: bool = False,
     ):
         """
         Initialize the trading bot with the specified parameters
@@ -55,6 +62,9 @@ class TradingBot:
             time_frame: Timeframe for candlestick data
             market_hours_only: Whether to trade only during market hours
             cooldown_period: Period to wait between trading cycles (seconds)
+            max_concurrency: Maximum number of symbols analyzed at once
+            stream_bars: Stream minute bars over the websocket and run a cycle when
+                they arrive, instead of polling every cooldown period (1Min only)
         """
         setup_logging()
         self.symbols = symbols
@@ -64,16 +74,23 @@ class TradingBot:
         self.time_frame = time_frame
         self.market_hours_only = market_hours_only
         self.cooldown_period = cooldown_period
+        self._analysis_semaphore = asyncio.Semaphore(max_concurrency)
+        self.stream_bars = stream_bars
         
         # Initialize the API client
         self.client = AlpacaClient(api_key, api_secret, paper)
         
         # Initialize data provider
-        self.data_provider = DataProvider(self.client)
+        self.data_provider = DataProvider(self.client, timeframe=time_frame)
+        
+        # Compile strategy kernels now rather than on the first trading cycle
+        _kernels.warmup()
         
         # Trading state
         self.positions = {}
         self.account_info = {}
+        self._risk_amount = 0.0  # Equity * risk_per_trade, updated with account_info
+        self._last_refresh = 0.0  # time.monotonic() of the last account/positions update
         self.is_running = False
         
         # Register signal handlers
@@ -92,25 +109,35 @@ class TradingBot:
         logger.info("Starting trading bot")
         
         try:
+            # Open the shared HTTP session up front so the first cycle doesn't pay for it
+            await self.client.connect()
+            
             # Initial updates
-            await self._update_account_info()
-            await self._update_positions()
+            await self._load_initial_state()
+            
+            streaming = self._start_stream()
+            updated = None  # Symbols with new streamed bars; None means all symbols
             
             while self.is_running:
+                # Refresh account, positions and market clock in one concurrent round
+                is_open = await self._refresh_state()
+                
                 # Check if market is open
-                if self.market_hours_only:
-                    is_open = await self._check_market_status()
-                    if not is_open:
-                        logger.info("Market is closed, waiting for 5 minutes")
-                        await asyncio.sleep(300)  # Sleep for 5 minutes
-                        continue
+                if self.market_hours_only and not is_open:
+                    logger.info("Market is closed, waiting for 5 minutes")
+                    await asyncio.sleep(300)  # Sleep for 5 minutes
+                    continue
                 
                 # Run a complete trading cycle
-                await self._trading_cycle()
+                await self._trading_cycle(updated)
                 
-                # Wait for cooldown period
+                # Wait for cooldown period; when streaming, wake early on new bars
                 logger.debug(f"Waiting for {self.cooldown_period} seconds until next cycle")
-                await asyncio.sleep(self.cooldown_period)
+                if streaming:
+                    # A timeout with no bars falls back to a full polling cycle
+                    updated = await self.data_provider.wait_for_bars(self.cooldown_period) or None
+                else:
+                    await asyncio.sleep(self.cooldown_period)
         
         except Exception as e:
             logger.error(f"Error in main trading loop: {e}", exc_info=True)
@@ -118,16 +145,38 @@ class TradingBot:
         finally:
             await self._cleanup()
     
-    async def _trading_cycle(self):
+    def _start_stream(self) -> bool:
+        """
+        Start streaming bars for the traded symbols if enabled
+        
+        Returns:
+            True if the bar stream was started
+        """
+        if not self.stream_bars:
+            return False
+        
+        if self.time_frame != "1Min":
+            logger.warning(f"Bar streaming only supports 1Min bars, polling {self.time_frame} instead")
+            return False
+        
+        try:
+            self.data_provider.start_stream(self.symbols)
+        except ImportError as e:
+            logger.warning(f"Bar streaming unavailable ({e}), polling instead")
+            return False
+        
+        logger.info(f"Streaming bars for {len(self.symbols)} symbols")
+        return True
+    
+    async def _trading_cycle(self, symbols: Optional[List[str]] = None):
         """
         Execute a complete trading cycle for all strategies and symbols
+        
+        Args:
+            symbols: Restrict the cycle to these symbols (all traded symbols if None)
         """
         logger.debug("Starting trading cycle")
         
-        # Update account and positions
-        await self._update_account_info()
-        await self._update_positions()
-        
         # Calculate how many new positions we can take
         current_positions = len(self.positions)
         available_slots = max(0, self.max_positions - current_positions)
@@ -138,65 +187,86 @@ class TradingBot:
         
         logger.info(f"Current positions: {current_positions}, available slots: {available_slots}")
         
-        # Process each symbol
-        for symbol in self.symbols:
-            # Skip symbols we already have positions in
-            if symbol in self.positions:
-                continue
-            
-            # Get market data for this symbol
-            data = await self._fetch_data_for_symbol(symbol)
-            if data is None or data.empty:
+        # Skip symbols we already have positions in
+        candidates = [s for s in (symbols or self.symbols) if s not in self.positions]
+        
+        # Get market data for all candidates in one multi-symbol request
+        bars = await self._fetch_data(candidates)
+        
+        ready = []
+        for symbol in candidates:
+            data = bars.get(symbol)
+            if data is None or not len(data.ts):
                 logger.warning(f"No data available for {symbol}, skipping")
                 continue
+            ready.append((symbol, data))
+        
+        # Analyze all symbols concurrently; symbols are independent of each other
+        results = await asyncio.gather(*(self._analyze_symbol(symbol, data) for symbol, data in ready))
+        
+        # Execute signals one at a time so available slots are respected
+        for (symbol, _), signals in zip(ready, results):
+            for strategy, trade_signal in signals:
+                try:
+                    order_id = await self._execute_signal(symbol, trade_signal)
+                    if order_id:
+                        available_slots -= 1
+                        if available_slots <= 0:
+                            logger.info("Reached maximum positions, stopping cycle")
+                            return
+                
+                except Exception as e:
+                    logger.error(f"Error applying strategy {strategy.__class__.__name__} to {symbol}: {e}", exc_info=True)
+        
+        logger.debug("Trading cycle completed")
+    
+    async def _analyze_symbol(self, symbol: str, data: Bars) -> List[Tuple[Strategy, Dict]]:
+        """
+        Apply every strategy to one symbol's market data
+        
+        Args:
+            symbol: The ticker symbol being analyzed
+            data: Bars containing market data for the symbol
             
-            # Apply each strategy
+        Returns:
+            List of (strategy, signal) pairs for signals with an action
+        """
+        signals = []
+        async with self._analysis_semaphore:
             for strategy in self.strategies:
                 try:
                     # Generate signals based on data
                     signal = await strategy.analyze(symbol, data)
                     
-                    # Execute signal if not None
-                    if signal is not None:
-                        order_id = await self._execute_signal(symbol, signal)
-                        if order_id:
-                            available_slots -= 1
-                            if available_slots <= 0:
-                                logger.info("Reached maximum positions, stopping cycle")
-                                return
+                    # Keep only actionable signals
+                    if signal is not None and signal.get("action"):
+                        signals.append((strategy, signal))
                 
                 except Exception as e:
                     logger.error(f"Error applying strategy {strategy.__class__.__name__} to {symbol}: {e}", exc_info=True)
         
-        logger.debug("Trading cycle completed")
+        return signals
     
-    async def _fetch_data_for_symbol(self, symbol: str) -> Optional[pd.DataFrame]:
+    async def _fetch_data(self, symbols: List[str]) -> Dict[str, Bars]:
         """
-        Fetch market data for a specified symbol
+        Fetch market data for several symbols in a single request
         
         Args:
-            symbol: The ticker symbol to fetch data for
+            symbols: The ticker symbols to fetch data for
             
         Returns:
-            DataFrame containing market data or None if unavailable
+            Dictionary of Bars keyed by symbol; symbols without data are absent
         """
+        if not symbols:
+            return {}
+        
         try:
             # Fetch bars data
-            data = await self.data_provider.get_bars(
-                symbols=[symbol],
-                timeframe=self.time_frame,
-                limit=100  # Last 100 bars
-            )
-            
-            if not data or symbol not in data:
-                logger.warning(f"No data returned for {symbol}")
-                return None
-            
-            return data[symbol]
+            return await self.data_provider.get_bars_fixed(symbols, limit=100)  # Last 100 bars per symbol
         
         except Exception as e:
-            logger.error(f"Error fetching data for {symbol}: {e}", exc_info=True)
-            return None
+            logger.error(f"Error fetching data for {symbols}: {e}", exc_info=True)
+            return {}
     
     async def _execute_signal(self, symbol: str, signal: Dict) -> Optional[str]:
         """
@@ -217,7 +287,6 @@ class TradingBot:
         try:
             if action == "buy":
                 # Calculate position size based on risk
-                risk_amount = float(self.account_info.get("equity", 0)) * self.risk_per_trade
                 price = signal.get("price")
                 stop_loss = signal.get("stop_loss")
                 
@@ -230,31 +299,24 @@ class TradingBot:
                     logger.warning(f"Invalid risk per share for {symbol}: {risk_per_share}")
                     return None
                 
-                qty = int(risk_amount / risk_per_share)
+                qty = int(self._risk_amount / risk_per_share)
                 if qty <= 0:
                     logger.warning(f"Calculated quantity for {symbol} is zero or negative: {qty}")
                     return None
                 
-                # Place the order
-                logger.info(f"Placing buy order for {qty} shares of {symbol} at market")
+                # Place the entry with its stop loss attached (one-triggers-other), so the
+                # stop is registered server-side before the buy can fill
+                logger.info(f"Placing buy order for {qty} shares of {symbol} at market, stop at {stop_loss}")
                 order = await self.client.create_order(
                     symbol=symbol,
                     qty=qty,
                     side="buy",
-                    type="market"
+                    type="market",
+                    time_in_force="gtc",
+                    order_class="oto",
+                    stop_loss={"stop_price": round(stop_loss, 2)}
                 )
                 
-                # If we have a stop loss, set it
-                if stop_loss and order:
-                    await self.client.create_order(
-                        symbol=symbol,
-                        qty=qty,
-                        side="sell",
-                        type="stop",
-                        stop_price=stop_loss,
-                        time_in_force="gtc"
-                    )
-                
                 return order.get("id") if order else None
             
             elif action == "sell" or action == "exit":
@@ -267,47 +329,103 @@ class TradingBot:
             logger.error(f"Error executing {action} signal for {symbol}: {e}", exc_info=True)
             return None
     
-    async def _update_positions(self):
-        """Update the current positions from Alpaca"""
-        try:
-            positions = await self.client.list_positions()
+    def _set_account_info(self, account: Dict):
+        """
+        Store account information and the per-trade risk budget derived from it
+        
+        Args:
+            account: Account dictionary from the client
+        """
+        self.account_info = account
+        self._risk_amount = float(account.get("equity", 0)) * self.risk_per_trade
+        logger.info(f"Updated account info: Equity=${account.get('equity', 'N/A')}")
+    
+    async def _load_initial_state(self):
+        """Load account, positions and open orders from Alpaca in one concurrent snapshot"""
+        snapshot = await self.client.snapshot()
+        
+        for name, result in snapshot.items():
+            if isinstance(result, Exception):
+                logger.error(f"Error loading initial {name}: {result}")
+        
+        account = snapshot["account"]
+        if not isinstance(account, Exception):
+            self._set_account_info(account)
+        
+        positions = snapshot["positions"]
+        if not isinstance(positions, Exception):
             self.positions = {p["symbol"]: p for p in positions}
             logger.info(f"Updated positions: {len(self.positions)} active positions")
-        except Exception as e:
-            logger.error(f"Error updating positions: {e}", exc_info=True)
-    
-    async def _update_account_info(self):
-        """Update the account information from Alpaca"""
-        try:
-            account = await self.client.get_account()
-            self.account_info = account
-            logger.info(f"Updated account info: Equity=${account.get('equity', 'N/A')}")
-        except Exception as e:
-            logger.error(f"Error updating account info: {e}", exc_info=True)
+        
+        if not isinstance(account, Exception) and not isinstance(positions, Exception):
+            self._last_refresh = time.monotonic()
+        
+        orders = snapshot["orders"]
+        if not isinstance(orders, Exception):
+            logger.info(f"Found {len(orders)} open orders")
     
-    async def _check_market_status(self) -> bool:
+    async def _refresh_state(self) -> bool:
         """
-        Check if the market is currently open
+        Update account information and positions and check the market clock
+        
+        The three requests are independent, so they are issued concurrently and
+        the results assigned together once all have returned. Account and
+        positions loaded less than a second ago (e.g. by the startup snapshot)
+        are reused and only the clock is fetched.
         
         Returns:
             True if market is open, False otherwise
         """
-        try:
+        if time.monotonic() - self._last_refresh < 1:
             clock = await self.client.get_clock()
-            is_open = clock.get("is_open", False)
-            
-            if is_open:
-                logger.info("Market is open")
-            else:
-                next_open = clock.get("next_open")
-                next_close = clock.get("next_close")
-                logger.info(f"Market is closed. Next open: {next_open}, Next close: {next_close}")
-            
-            return is_open
+            return self._check_clock(clock)
         
-        except Exception as e:
-            logger.error(f"Error checking market status: {e}", exc_info=True)
+        account, positions, clock = await asyncio.gather(
+            self.client.get_account(),
+            self.client.list_positions(),
+            self.client.get_clock(),
+            return_exceptions=True
+        )
+        
+        if not isinstance(account, Exception) and not isinstance(positions, Exception):
+            self._last_refresh = time.monotonic()
+        
+        if isinstance(account, Exception):
+            logger.error(f"Error updating account info: {account}")
+        else:
+            self._set_account_info(account)
+        
+        if isinstance(positions, Exception):
+            logger.error(f"Error updating positions: {positions}")
+        else:
+            self.positions = {p["symbol"]: p for p in positions}
+            logger.info(f"Updated positions: {len(self.positions)} active positions")
+        
+        return self._check_clock(clock)
+    
+    def _check_clock(self, clock: Union[Dict, Exception]) -> bool:
+        """
+        Log the market clock and report whether the market is open
+        
+        Args:
+            clock: Clock dictionary, or the exception raised fetching it
+            
+        Returns:
+            True if market is open, False otherwise
+        """
+        if isinstance(clock, Exception):
+            logger.error(f"Error checking market status: {clock}")
             return False
+        
+        is_open = clock.get("is_open", False)
+        if is_open:
+            logger.info("Market is open")
+        else:
+            next_open = clock.get("next_open")
+            next_close = clock.get("next_close")
+            logger.info(f"Market is closed. Next open: {next_open}, Next close: {next_close}")
+        
+        return is_open
     
     def _handle_exit(self, signum, frame):
         """Handle exit signals gracefully"""
@@ -321,6 +439,7 @@ class TradingBot:
         try:
             if hasattr(self.data_provider, 'close'):
                 await self.data_provider.close()
+            await self.client.close()
         except Exception as e:
             logger.error(f"Error during cleanup: {e}", exc_info=True)
         logger.info("Trading bot shutdown complete")
@@ -349,7 +468,8 @@ async def run_bot(args):
         risk_per_trade=args.risk_per_trade,
         time_frame=args.timeframe,
         market_hours_only=args.market_hours_only,
-        cooldown_period=args.cooldown
+        cooldown_period=args.cooldown,
+        stream_bars=args.stream
     )
     
     await bot.run()
@@ -368,11 +488,15 @@ def main():
     parser.add_argument("--timeframe", default="1Min", help="Timeframe for candlestick data")
     parser.add_argument("--market-hours-only", action="store_true", default=True, help="Trade only during market hours")
     parser.add_argument("--cooldown", type=int, default=20, help="Cooldown period between cycles (seconds)")
+    parser.add_argument("--stream", action="store_true", help="Stream 1Min bars instead of polling")
     
     args = parser.parse_args()
     
+    # Run on uvloop where installed, otherwise the stock asyncio loop
+    runner = uvloop.run if uvloop is not None else asyncio.run
+    
     try:
-        asyncio.run(run_bot(args))
+        runner(run_bot(args))
     except KeyboardInterrupt:
         logger.info("Keyboard interrupt received, shutting down")
     except Exception as e:
@@ -0,0 +1,93 @@
+"""
+Prometheus Trading Bot - Background File Writer
+
+Writes files from a daemon thread so disk I/O never blocks the event loop
+"""
+
+import logging
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+WriteFunc = Callable[[BinaryIO], None]
+
+
+class BackgroundWriter:
+    """
+    Daemon thread that performs file writes queued from the event loop
+    
+    Writes are drained from the queue in batches. If a path is queued again
+    before the thread reaches it, only the latest write runs. Each file is
+    written to a temporary sibling and moved into place with os.replace, so a
+    crash mid-write never leaves a truncated file behind.
+    """
+    
+    def __init__(self):
+        """Create the writer; the thread starts on the first submitted write"""
+        self._queue: "queue.Queue[Optional[Tuple[Path, WriteFunc]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+    
+    def submit(self, path: Union[str, Path], write: WriteFunc):
+        """
+        Queue a file write
+        
+        Args:
+            path: Destination file
+            write: Called on the writer thread with the open binary file
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="background-writer", daemon=True)
+            self._thread.start()
+        
+        self._queue.put((Path(path), write))
+    
+    def close(self, timeout: Optional[float] = None):
+        """
+        Finish the queued writes and stop the thread (blocking)
+        
+        Args:
+            timeout: Maximum seconds to wait for the thread
+        """
+        if self._thread is None:
+            return
+        
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+    
+    def _run(self):
+        """Write queued files in batches until close() is called"""
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            
+            # Collect everything already queued, keeping the latest write per path
+            batch: Dict[Path, WriteFunc] = {}
+            while True:
+                if item is None:
+                    stop = True
+                else:
+                    batch[item[0]] = item[1]
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            
+            for path, write in batch.items():
+                try:
+                    self._write(path, write)
+                except Exception as e:
+                    logger.error("Error writing %s: %s", path, e)
+    
+    @staticmethod
+    def _write(path: Path, write: WriteFunc):
+        """Write a file atomically via a temporary sibling"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
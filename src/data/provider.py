@@ -5,13 +5,225 @@ Handles data fetching, caching, and preprocessing for trading strategies
 """
 
 import asyncio
+import functools
+import logging
+import time
+from collections import namedtuple
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
+import orjson
 import pandas as pd
 import numpy as np
+from pandas.api.types import is_numeric_dtype
+
+from src.api.alpaca import MAX_BARS_PER_REQUEST, AlpacaClient
+from src.data._writer import BackgroundWriter
+
+try:
+    import websockets
+except ImportError:  # Optional: only needed for streaming bars
+    websockets = None
+
+logger = logging.getLogger(__name__)
+
+BAR_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+STREAM_URL = "wss://stream.data.alpaca.markets/v2/{feed}"
+STREAM_TIMEFRAME = "1Min"  # The bar stream only publishes minute bars
+
+
+class Bars(namedtuple('Bars', 'ts open high low close volume')):
+    """
+    Bar history for one symbol as parallel NumPy arrays
+    
+    ts is a sorted, unique datetime64[ns] array of naive UTC timestamps; the
+    price fields are float64 and volume is int64. Use len(bars.ts) for the number
+    of bars, since len(bars) is the number of fields.
+    """
+    __slots__ = ()
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "Bars":
+        """
+        Convert a bar DataFrame with a timestamp index, without cleaning it
+        
+        Args:
+            df: DataFrame with OHLCV columns
+            
+        Returns:
+            Bars with the frame's rows in their original order
+        """
+        index = df.index
+        if isinstance(index, pd.DatetimeIndex):
+            # asi8 is already UTC for tz-aware indexes, so no converted index is built
+            ts = index.as_unit("ns").asi8.view("datetime64[ns]")
+        else:
+            ts = np.asarray(index, dtype="datetime64[ns]")
+        
+        # Each column is converted once, straight to its target dtype; non-numeric
+        # columns (e.g. prices parsed as strings) are coerced, with failures becoming NaN
+        prices = []
+        for col in BAR_COLUMNS[:4]:
+            values = df[col]
+            if not is_numeric_dtype(values.dtype):
+                values = pd.to_numeric(values, errors='coerce')
+            prices.append(values.to_numpy(dtype=np.float64))
+        
+        volume = df['volume']
+        if not is_numeric_dtype(volume.dtype):
+            volume = pd.to_numeric(volume, errors='coerce').fillna(0)
+        
+        return cls._make([ts, *prices, volume.to_numpy()])
+    
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray]) -> "Bars":
+        """
+        Wrap the column arrays returned by AlpacaClient.get_bars_arrays, without copying
+        
+        Args:
+            columns: Mapping with timestamp and OHLCV arrays
+            
+        Returns:
+            Bars over the same arrays, in their original order
+        """
+        return cls(columns["timestamp"], *(columns[col] for col in BAR_COLUMNS))
+    
+    def tail(self, n: int) -> "Bars":
+        """Return the last n bars as views of the same arrays"""
+        return Bars(*(values[-n:] for values in self))
+    
+    def to_frame(self) -> pd.DataFrame:
+        """Build a DataFrame with a UTC timestamp index"""
+        index = pd.DatetimeIndex(self.ts, name="timestamp").tz_localize("UTC")
+        return pd.DataFrame({col: getattr(self, col) for col in BAR_COLUMNS}, index=index)
+
+
+EMPTY_BARS = Bars._make([
+    np.empty(0, dtype="datetime64[ns]"),
+    *(np.empty(0, dtype=np.float64) for _ in range(4)),
+    np.empty(0, dtype=np.int64)
+])
+
+
+class BarRing:
+    """
+    Fixed-capacity bar history for one (symbol, timeframe)
+    
+    Storage is preallocated once and new bars overwrite the oldest. Every row
+    is written twice, at head and head + capacity, so the most recent bars are
+    always one contiguous slice of each array and reads never need to stitch
+    the two ends of the ring together. All access happens on the event loop
+    thread, so no locking is needed.
+    """
+    
+    def __init__(self, capacity: int):
+        """
+        Allocate an empty ring
+        
+        Args:
+            capacity: Maximum number of bars held
+        """
+        self.capacity = capacity
+        self.head = 0  # Next write position in [0, capacity)
+        self.size = 0
+        self._arrays = Bars._make([
+            np.empty(2 * capacity, dtype="datetime64[ns]"),
+            *(np.empty(2 * capacity, dtype=np.float64) for _ in range(4)),
+            np.empty(2 * capacity, dtype=np.int64)
+        ])
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    @property
+    def last_ts(self) -> np.datetime64:
+        """Timestamp of the newest bar"""
+        return self._arrays.ts[self.head + self.capacity - 1]
+    
+    def extend(self, bars: Bars):
+        """
+        Add bars sorted by timestamp, replacing held bars at or after the first one
+        
+        Args:
+            bars: Bars to add
+        """
+        if not len(bars.ts):
+            return
+        
+        # Drop held bars the new ones supersede (e.g. a bar that was still forming)
+        held = self._arrays.ts[self.head + self.capacity - self.size:self.head + self.capacity]
+        drop = self.size - int(np.searchsorted(held, bars.ts[0]))
+        self.head = (self.head - drop) % self.capacity
+        self.size -= drop
+        
+        bars = bars.tail(self.capacity)
+        n = len(bars.ts)
+        pos = (self.head + np.arange(n)) % self.capacity
+        for buffer, values in zip(self._arrays, bars):
+            buffer[pos] = values
+            buffer[pos + self.capacity] = values
+        
+        self.head = (self.head + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+    
+    def append(self, ts: np.datetime64, open: float, high: float, low: float, close: float, volume: int):
+        """
+        Add a single bar, replacing the newest held bar if it has the same timestamp
+        
+        Args:
+            ts: Bar timestamp (naive UTC)
+            open, high, low, close, volume: Bar values
+        """
+        if self.size and self.last_ts >= ts:
+            if self.last_ts > ts:
+                # Out-of-order bar; take the general path
+                self.extend(Bars(*(np.array([v]) for v in (ts, open, high, low, close, volume))))
+                return
+            self.head = (self.head - 1) % self.capacity
+            self.size -= 1
+        
+        for buffer, value in zip(self._arrays, (ts, open, high, low, close, volume)):
+            buffer[self.head] = value
+            buffer[self.head + self.capacity] = value
+        
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+    
+    def tail(self, n: int) -> Bars:
+        """
+        Copy out the most recent bars
+        
+        A copy rather than a view, since later writes reuse the same storage
+        
+        Args:
+            n: Maximum number of bars
+            
+        Returns:
+            Bars with up to n of the newest bars
+        """
+        end = self.head + self.capacity
+        start = end - min(n, self.size)
+        return Bars(*(buffer[start:end].copy() for buffer in self._arrays))
+
+
+def as_bars(data: Union[Bars, pd.DataFrame, None]) -> Bars:
+    """
+    Accept Bars or a bar DataFrame where strategies take market data
+    
+    Args:
+        data: Bars, DataFrame with OHLCV columns, or None
+        
+    Returns:
+        Bars (empty for None)
+    """
+    if data is None:
+        return EMPTY_BARS
+    if isinstance(data, Bars):
+        return data
+    return Bars.from_frame(data)
 
-from src.api.alpaca import AlpacaClient
 
 class DataProvider:
     """
@@ -20,25 +232,49 @@ class DataProvider:
     Handles fetching, caching, and preprocessing data from various sources
     """
     
-    def __init__(self, client: AlpacaClient):
+    def __init__(
+        self,
+        client: AlpacaClient,
+        max_cached_bars: int = 1000,
+        timeframe: str = "1Min",
+        persist_dir: Optional[Union[str, Path]] = None
+    ):
         """
         Initialize the data provider
         
         Args:
             client: API client for data fetching
+            max_cached_bars: Ring capacity (bars kept) per symbol and timeframe
+            timeframe: Default timeframe, used by get_bars_fixed
+            persist_dir: Directory for persist_bars/load_persisted_bars (None disables)
         """
         self.client = client
+        self.timeframe = timeframe
+        
+        # Cached bars can be written to disk for recovery after a restart; the writes
+        # happen on a background thread so they never stall the event loop
+        self.persist_dir = Path(persist_dir) if persist_dir else None
+        self._writer = BackgroundWriter() if self.persist_dir else None
         
-        # Cache settings
-        self.cache = {}  # Symbol -> DataFrame cache
-        self.cache_timestamps = {}  # Symbol -> last update time
-        self.cache_duration = timedelta(minutes=5)  # How long to keep cached data
+        # Cache settings: bars are stored once per (symbol, timeframe) in a bounded
+        # ring of ts/open/high/low/close/volume arrays, so any limit can be sliced from them
+        self.bars: Dict[Tuple[str, str], BarRing] = {}
+        self._expiry_ns: Dict[Tuple[str, str], int] = {}  # (symbol, timeframe) -> monotonic expiry
+        self.cache_depth: Dict[Tuple[str, str], int] = {}  # (symbol, timeframe) -> largest limit fetched in full
+        self.cache_duration_ns = 5 * 60 * 1_000_000_000  # How long before new bars are fetched
+        self.max_cached_bars = max_cached_bars
+        
+        # Bar stream: symbols with a streamed bar since the last wait_for_bars()
+        self._stream_task: Optional[asyncio.Task] = None
+        self._updated_symbols: Set[str] = set()
+        self._bar_event = asyncio.Event()
         
         # Statistics tracking
-        self.stats = {
+        self.stats: Dict[str, Any] = {
             "requests": 0,
             "cache_hits": 0,
             "failed_requests": 0,
+            "streamed_bars": 0,
             "last_request_time": None
         }
     
@@ -52,33 +288,143 @@ class DataProvider:
         use_cache: bool = True
     ) -> Dict[str, pd.DataFrame]:
         """
-        Get historical bar data for symbols
+        Get historical bar data for symbols as DataFrames
+        
+        Same as get_bars_arrays, with each result converted to a DataFrame.
+        Hot paths should use get_bars_arrays directly.
         
         Args:
             symbols: List of symbols to get data for
             timeframe: Bar timeframe (1Min, 5Min, 15Min, 1H, 1D)
-            limit: Maximum number of bars to retrieve
-            start: Start time in ISO format
-            end: End time in ISO format
+            limit: Maximum number of bars to retrieve per symbol
+            start: Start time in ISO format (bypasses the cache)
+            end: End time in ISO format (bypasses the cache)
             use_cache: Whether to use cached data if available
             
         Returns:
             Dictionary mapping symbols to DataFrames with bar data
         """
+        bars = await self.get_bars_arrays(symbols, timeframe, limit, start, end, use_cache)
+        return {symbol: b.to_frame() for symbol, b in bars.items()}
+    
+    async def get_bars_arrays(
+        self,
+        symbols: List[str],
+        timeframe: str = "1Min",
+        limit: int = 100,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Bars]:
+        """
+        Get historical bar data for symbols
+        
+        Cached symbols are served by slicing the stored arrays. Once the cache
+        duration has passed, only bars since the last cached one are fetched.
+        
+        Args:
+            symbols: List of symbols to get data for
+            timeframe: Bar timeframe (1Min, 5Min, 15Min, 1H, 1D)
+            limit: Maximum number of bars to retrieve per symbol
+            start: Start time in ISO format (bypasses the cache)
+            end: End time in ISO format (bypasses the cache)
+            use_cache: Whether to use cached data if available
+            
+        Returns:
+            Dictionary mapping symbols to Bars
+        """
         self.stats["requests"] += 1
         self.stats["last_request_time"] = datetime.now()
         
-        # Check cache first if enabled
-        if use_cache:
-            cache_key = f"{','.join(sorted(symbols))}_{timeframe}_{limit}"
+        # Explicit ranges are fetched as-is; the cache only tracks the trailing bars
+        if not use_cache or start or end:
+            return await self._fetch_bars(symbols, timeframe, limit, start=start, end=end)
+        
+        # Sort symbols into fresh hits, stale entries that only need new bars, and misses
+        rings, stale, missing = {}, [], []
+        now = time.monotonic_ns()
+        for symbol in symbols:
+            key = (symbol, timeframe)
+            cached = self.bars.get(key)
+            if cached is None or self.cache_depth.get(key, 0) < limit:
+                missing.append(symbol)
+                continue
+            if self._expiry_ns.get(key, 0) <= now:
+                stale.append(symbol)
+            rings[symbol] = cached
+        
+        if not stale and not missing:
+            # All fresh: slice the rings found above without touching the dicts again
+            self.stats["cache_hits"] += 1
+            return {symbol: ring.tail(limit) for symbol, ring in rings.items() if len(ring)}
+        
+        try:
+            if stale:
+                # One request for everything new since the oldest last bar among them
+                since = np.min([rings[s].last_ts for s in stale])
+                fresh = await self._fetch_bars(
+                    stale, timeframe, MAX_BARS_PER_REQUEST,
+                    start=pd.Timestamp(since, tz="UTC").isoformat()
+                )
+                for symbol in stale:
+                    if symbol in fresh:
+                        self._merge_bars((symbol, timeframe), fresh[symbol])
+            
+            if missing:
+                fetched = await self._fetch_bars(missing, timeframe, limit)
+                for symbol, bars in fetched.items():
+                    key = (symbol, timeframe)
+                    self.cache_depth[key] = max(self.cache_depth.get(key, 0), limit)
+                    self._store_bars(key, bars)
+        
+        except Exception as e:
+            self.stats["failed_requests"] += 1
+            logger.error("Error updating cached bars: %s", e)
+        
+        result = {}
+        for symbol in symbols:
+            cached = self.bars.get((symbol, timeframe))
+            if cached is not None and len(cached):
+                result[symbol] = cached.tail(limit)
+        return result
+    
+    async def get_bars_fixed(self, symbols: List[str], limit: int = 100) -> Dict[str, Bars]:
+        """
+        Get bars for symbols at the provider's timeframe
+        
+        Args:
+            symbols: List of symbols to get data for
+            limit: Maximum number of bars to retrieve per symbol
             
-            if cache_key in self.cache and self._is_cache_valid(cache_key):
-                self.stats["cache_hits"] += 1
-                return self.cache[cache_key]
+        Returns:
+            Dictionary mapping symbols to Bars
+        """
+        return await self.get_bars_arrays(symbols, self.timeframe, limit)
+    
+    async def _fetch_bars(
+        self,
+        symbols: List[str],
+        timeframe: str,
+        limit: int,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> Dict[str, Bars]:
+        """
+        Fetch bars from the API and run them through the cleaning pipeline
         
-        # Fetch data from API
+        Args:
+            symbols: List of symbols to get data for
+            timeframe: Bar timeframe
+            limit: Maximum number of bars to retrieve per symbol
+            start: Start time in ISO format
+            end: End time in ISO format
+            
+        Returns:
+            Dictionary mapping symbols to cleaned, non-empty Bars
+        """
         try:
-            data = await self.client.get_bars(
+            # Column arrays straight from the response; no DataFrame on this path
+            data = await self.client.get_bars_arrays(
                 symbols=symbols,
                 timeframe=timeframe,
                 limit=limit,
@@ -87,78 +433,96 @@ class DataProvider:
             )
             
             # Process data through cleaning pipeline for each symbol
-            for symbol in data:
-                if symbol in data and not data[symbol].empty:
-                    data[symbol] = self._clean_and_prepare_data(data[symbol])
+            result = {}
+            for symbol, columns in data.items():
+                bars = self._clean_and_prepare_data(Bars.from_columns(columns))
+                if len(bars.ts):
+                    result[symbol] = bars
             
-            # Cache the result if valid
-            if use_cache and data:
-                self.cache[cache_key] = data
-                self.cache_timestamps[cache_key] = datetime.now()
-            
-            return data
+            return result
             
         except Exception as e:
             self.stats["failed_requests"] += 1
-            print(f"Error fetching bars: {e}")
+            logger.error("Error fetching bars: %s", e)
             return {}
     
-    def _is_cache_valid(self, cache_key: str) -> bool:
+    def _store_bars(self, key: Tuple[str, str], bars: Bars):
         """
-        Check if cached data is still valid
+        Replace the cached bars for a key
+        
+        At most max_cached_bars are kept, or the largest limit requested if deeper.
         
         Args:
-            cache_key: Cache key to check
-            
-        Returns:
-            True if cache is valid, False otherwise
+            key: (symbol, timeframe) cache key
+            bars: Cleaned bars
         """
-        if cache_key not in self.cache_timestamps:
-            return False
-            
-        age = datetime.now() - self.cache_timestamps[cache_key]
-        return age < self.cache_duration
+        ring = BarRing(max(self.max_cached_bars, self.cache_depth.get(key, 0)))
+        ring.extend(bars)
+        self.bars[key] = ring
+        self._expiry_ns[key] = time.monotonic_ns() + self.cache_duration_ns
     
-    def _clean_and_prepare_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _merge_bars(self, key: Tuple[str, str], new: Bars):
+        """
+        Append newly fetched bars to the cached bars for a key
+        
+        New bars supersede cached bars at or after their first timestamp, so a bar
+        that was still forming at the last fetch is replaced.
+        
+        Args:
+            key: (symbol, timeframe) cache key
+            new: Cleaned new bars
+        """
+        self.bars[key].extend(new)
+        self._expiry_ns[key] = time.monotonic_ns() + self.cache_duration_ns
+    
+    def _clean_and_prepare_data(self, df: Union[Bars, pd.DataFrame]) -> Bars:
         """
         Clean and prepare data for analysis
         
+        A single NumPy pass: rows with a missing price are dropped, then np.unique
+        sorts by timestamp and keeps the first row of any duplicated timestamp.
+        API responses are normally already strictly increasing and complete; that
+        is checked in O(n) and the arrays are used without masking or sorting.
+        
         Args:
-            df: DataFrame with raw data
+            df: Raw Bars, or a DataFrame with raw data
             
         Returns:
-            DataFrame with cleaned and prepared data
+            Bars with cleaned and prepared data (empty if unusable)
         """
-        if df.empty:
-            return df
+        if isinstance(df, Bars):
+            bars = df
+        else:
+            if df.empty:
+                return EMPTY_BARS
+            
+            # Ensure required columns exist
+            for col in BAR_COLUMNS:
+                if col not in df.columns:
+                    logger.warning("Missing column %s in DataFrame", col)
+                    return EMPTY_BARS
             
-        # Make a copy to avoid modifying the original
-        df = df.copy()
+            bars = Bars.from_frame(df)
         
-        # Ensure required columns exist
-        required_cols = ['open', 'high', 'low', 'close', 'volume']
-        for col in required_cols:
-            if col not in df.columns:
-                print(f"Warning: Missing column {col} in DataFrame")
-                return pd.DataFrame()  # Return empty DataFrame if missing columns
+        if not len(bars.ts):
+            return EMPTY_BARS
         
         # Remove rows with NaN values in required columns
-        df = df.dropna(subset=required_cols)
+        mask = ~np.isnan(np.stack(bars[1:5])).any(axis=0)
+        volume = bars.volume
+        if volume.dtype.kind == 'f':
+            mask &= ~np.isnan(volume)
         
-        # Remove duplicate indices
-        df = df[~df.index.duplicated(keep='first')]
+        if not mask.all():
+            bars = Bars(*(values[mask] for values in bars))
         
-        # Sort by timestamp
-        df = df.sort_index()
+        # Sort by timestamp and remove duplicates, unless already strictly increasing
+        ts = bars.ts
+        if len(ts) > 1 and not (ts[1:] > ts[:-1]).all():
+            ts, idx = np.unique(ts, return_index=True)
+            bars = Bars(ts, *(values[idx] for values in bars[1:]))
         
-        # Convert to float (in case they're objects)
-        for col in ['open', 'high', 'low', 'close']:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        # Convert volume to int
-        df['volume'] = pd.to_numeric(df['volume'], errors='coerce').fillna(0).astype(np.int64)
-        
-        return df
+        return bars._replace(volume=bars.volume.astype(np.int64, copy=False))
     
     async def get_latest_price(self, symbol: str) -> Optional[float]:
         """
@@ -172,19 +536,19 @@ class DataProvider:
         """
         try:
             # Get the latest 1-minute bar
-            bars = await self.get_bars(
+            bars = await self.get_bars_arrays(
                 symbols=[symbol],
                 timeframe="1Min",
                 limit=1
             )
             
-            if symbol in bars and not bars[symbol].empty:
-                return float(bars[symbol]['close'].iloc[-1])
+            if symbol in bars:
+                return float(bars[symbol].close[-1])
                 
             return None
             
         except Exception as e:
-            print(f"Error getting latest price for {symbol}: {e}")
+            logger.error("Error getting latest price for %s: %s", symbol, e)
             return None
     
     async def get_daily_bars(
@@ -229,20 +593,126 @@ class DataProvider:
         Returns:
             Dictionary mapping timeframes to DataFrames
         """
-        result = {}
+        # Fetch all timeframes concurrently; they are independent requests
+        results = await asyncio.gather(*(
+            self.get_bars(symbols=[symbol], timeframe=tf, limit=limit)
+            for tf in timeframes
+        ))
         
-        # Fetch data for each timeframe
-        for tf in timeframes:
-            data = await self.get_bars(
-                symbols=[symbol],
-                timeframe=tf,
-                limit=limit
-            )
+        return {tf: data[symbol] for tf, data in zip(timeframes, results) if symbol in data}
+    
+    def start_stream(self, symbols: List[str], feed: str = "iex"):
+        """
+        Start streaming minute bars for symbols into the cache in the background
+        
+        Each streamed bar is appended to the cached history for (symbol, "1Min")
+        and marks the symbol as updated for wait_for_bars(). Symbols are only
+        appended to once their history has been loaded through get_bars_arrays,
+        since a lone streamed bar is not a usable history.
+        
+        Args:
+            symbols: Symbols to subscribe to
+            feed: Alpaca data feed ("iex" or "sip")
+        """
+        if websockets is None:
+            raise ImportError("websockets is required for streaming bars")
+        
+        if self._stream_task is None or self._stream_task.done():
+            self._stream_task = asyncio.create_task(self._stream_bars(list(symbols), feed))
+    
+    async def stop_stream(self):
+        """Stop the background bar stream if it is running"""
+        if self._stream_task is not None:
+            self._stream_task.cancel()
+            try:
+                await self._stream_task
+            except asyncio.CancelledError:
+                pass
+            self._stream_task = None
+    
+    async def wait_for_bars(self, timeout: float, settle: float = 0.5) -> List[str]:
+        """
+        Wait until the stream delivers a new bar or the timeout passes
+        
+        Bars for different symbols arrive spread over a moment after each minute
+        closes, so after the first one a short settle period collects the rest.
+        
+        Args:
+            timeout: Maximum seconds to wait
+            settle: Seconds to keep collecting after the first new bar
             
-            if symbol in data:
-                result[tf] = data[symbol]
+        Returns:
+            Symbols that received a bar since the last call (empty on timeout)
+        """
+        try:
+            await asyncio.wait_for(self._bar_event.wait(), timeout)
+            await asyncio.sleep(settle)
+        except asyncio.TimeoutError:
+            pass
         
-        return result
+        self._bar_event.clear()
+        updated = list(self._updated_symbols)
+        self._updated_symbols.clear()
+        return updated
+    
+    async def _stream_bars(self, symbols: List[str], feed: str):
+        """
+        Maintain the websocket subscription, reconnecting with backoff on failure
+        
+        Args:
+            symbols: Symbols to subscribe to
+            feed: Alpaca data feed
+        """
+        delay = 1.0
+        while True:
+            try:
+                async with websockets.connect(STREAM_URL.format(feed=feed)) as ws:
+                    await ws.send(orjson.dumps({
+                        "action": "auth",
+                        "key": self.client.api_key,
+                        "secret": self.client.api_secret
+                    }).decode())
+                    await ws.send(orjson.dumps({"action": "subscribe", "bars": symbols}).decode())
+                    
+                    async for message in ws:
+                        for msg in orjson.loads(message):
+                            kind = msg.get("T")
+                            if kind == "b":
+                                self._on_bar(msg)
+                                delay = 1.0
+                            elif kind == "error":
+                                logger.warning("Bar stream error %s: %s", msg.get("code"), msg.get("msg"))
+            
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Bar stream disconnected: %s; reconnecting in %.0fs", e, delay)
+            
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+    
+    def _on_bar(self, msg: Dict):
+        """
+        Fold one streamed bar into the cache
+        
+        Args:
+            msg: Bar message from the stream
+        """
+        symbol = msg["S"]
+        key = (symbol, STREAM_TIMEFRAME)
+        if key not in self.bars:
+            return
+        
+        t = msg["t"]
+        self.bars[key].append(
+            np.datetime64(t[:-1] if t.endswith("Z") else t, "ns"),
+            msg["o"], msg["h"], msg["l"], msg["c"], msg["v"]
+        )
+        self._expiry_ns[key] = time.monotonic_ns() + self.cache_duration_ns
+        self.stats["streamed_bars"] += 1
+        
+        self._updated_symbols.add(symbol)
+        self._bar_event.set()
     
     def get_cache_stats(self) -> Dict:
         """
@@ -252,22 +722,106 @@ class DataProvider:
             Dictionary with cache statistics
         """
         return {
-            "cache_size": len(self.cache),
+            "cache_size": len(self.bars),
             "cache_hits": self.stats["cache_hits"],
             "requests": self.stats["requests"],
             "hit_ratio": self.stats["cache_hits"] / max(1, self.stats["requests"]),
             "failed_requests": self.stats["failed_requests"],
+            "streamed_bars": self.stats["streamed_bars"],
             "last_request_time": self.stats["last_request_time"].isoformat() if self.stats["last_request_time"] else None
         }
     
+    def persist_bars(self, symbols: Optional[List[str]] = None, timeframe: Optional[str] = None) -> int:
+        """
+        Queue the cached bars for writing to persist_dir
+        
+        The bars are copied here and serialized on the writer thread, so this
+        returns immediately.
+        
+        Args:
+            symbols: Symbols to persist (all cached symbols if None)
+            timeframe: Timeframe to persist (the provider's timeframe if None)
+            
+        Returns:
+            Number of symbols queued
+        """
+        if self._writer is None:
+            return 0
+        
+        timeframe = timeframe or self.timeframe
+        queued = 0
+        for (symbol, tf), ring in self.bars.items():
+            if tf != timeframe or not len(ring) or (symbols is not None and symbol not in symbols):
+                continue
+            
+            bars = ring.tail(len(ring))
+            self._writer.submit(self._persist_path(symbol, tf), functools.partial(np.savez, **bars._asdict()))
+            queued += 1
+        
+        return queued
+    
+    def load_persisted_bars(self, symbols: List[str], timeframe: Optional[str] = None) -> int:
+        """
+        Seed the cache from bars written by persist_bars
+        
+        Loaded bars are marked stale, so the next request only fetches the bars
+        since the last persisted one.
+        
+        Args:
+            symbols: Symbols to load
+            timeframe: Timeframe to load (the provider's timeframe if None)
+            
+        Returns:
+            Number of symbols loaded
+        """
+        if self.persist_dir is None:
+            return 0
+        
+        timeframe = timeframe or self.timeframe
+        loaded = 0
+        for symbol in symbols:
+            path = self._persist_path(symbol, timeframe)
+            if not path.exists():
+                continue
+            
+            try:
+                with np.load(path) as data:
+                    bars = Bars(*(data[field] for field in Bars._fields))
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning("Ignoring unreadable bar file %s: %s", path, e)
+                continue
+            
+            if not len(bars.ts):
+                continue
+            
+            key = (symbol, timeframe)
+            self.cache_depth[key] = max(self.cache_depth.get(key, 0), len(bars.ts))
+            self._store_bars(key, bars)
+            self._expiry_ns[key] = 0
+            loaded += 1
+        
+        return loaded
+    
+    def _persist_path(self, symbol: str, timeframe: str) -> Path:
+        """File holding the persisted bars for a symbol and timeframe"""
+        assert self.persist_dir is not None  # Callers return early when persistence is off
+        return self.persist_dir / f"{symbol}_{timeframe}.npz"
+    
     async def clear_cache(self):
         """Clear the data cache"""
-        self.cache.clear()
-        self.cache_timestamps.clear()
-        print("Cache cleared")
+        self.bars.clear()
+        self._expiry_ns.clear()
+        self.cache_depth.clear()
+        logger.info("Cache cleared")
         
     async def close(self):
         """Close any open connections"""
-        # No connections to close currently
-        self.clear_cache()
-        print("Data provider closed") 
\ No newline at end of file
+        await self.stop_stream()
+        
+        if self._writer is not None:
+            # Persist the latest bars, then wait for all queued writes to finish
+            self.persist_bars()
+            await asyncio.to_thread(self._writer.close)
+        
+        await self.clear_cache()
+        logger.info("Data provider closed") 
\ No newline at end of file
@@ -4,14 +4,25 @@ Prometheus Trading Bot - API Utilities
 Handles Alpaca API connections with retry mechanism and error handling
 """
 
+import atexit
 import os
+import random
+import threading
 import time
-from typing import Any, Callable, Dict, Optional, TypeVar, Union
+from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
 
 import alpaca_trade_api as tradeapi
+import orjson
+import pandas as pd
+import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 from src.utils import logging as log
+from src.utils.timeframe import lookback_start
+
+# Load environment variables once at import rather than per client
+load_dotenv()
 
 # Type variable for generic function return
 T = TypeVar('T')
@@ -19,6 +30,18 @@ T = TypeVar('T')
 # Default retry settings
 MAX_RETRIES = 3  # Max retries for API calls
 RETRY_DELAY_BASE = 2  # Base for exponential backoff (2^retry_count seconds)
+MAX_RETRY_DELAY = 30  # Cap on a single backoff sleep (seconds)
+RETRY_DEADLINE = 60  # Cap on the total time spent retrying one call (seconds)
+RETRY_STATUSES = {429, 500, 502, 503, 504}  # HTTP statuses worth retrying
+
+# Circuit breaker: after this many consecutive calls exhaust their retries,
+# calls fail immediately for the cooldown instead of retrying into an outage
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30  # seconds
+
+# Connection pool settings for the REST session
+POOL_CONNECTIONS = 4  # Hosts with a pool (trading and data API)
+POOL_MAXSIZE = 32  # Keep-alive connections kept per host
 
 class AlpacaClient:
     """
@@ -43,9 +66,6 @@ class AlpacaClient:
             max_retries: Maximum number of retries for API calls
             retry_delay_base: Base for exponential backoff
         """
-        # Load environment variables if not already loaded
-        load_dotenv()
-        
         # Use provided credentials or get from environment
         self.api_key = api_key or os.getenv('ALPACA_KEY')
         self.api_secret = api_secret or os.getenv('ALPACA_SECRET')
@@ -57,49 +77,161 @@ class AlpacaClient:
         self.max_retries = max_retries
         self.retry_delay_base = retry_delay_base
         
+        # Circuit breaker state, shared by calls made from worker threads
+        self._breaker_lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._breaker_open_until = 0.0
+        
         # Initialize API client
         self.api = tradeapi.REST(
             key_id=self.api_key, 
             secret_key=self.api_secret, 
             base_url=self.base_url
         )
+        self.session = self._configure_session()
         
         log.info(f"Alpaca API client initialized with base URL: {self.base_url}")
     
-    def retry_api_call(self, func: Callable[[], T], max_retries: Optional[int] = None) -> Optional[T]:
+    def _configure_session(self) -> requests.Session:
+        """
+        Pool keep-alive connections on the REST client's HTTP session
+        
+        tradeapi.REST sends every request through its own requests.Session; mounting
+        a larger pool on it lets consecutive calls reuse open TCP/TLS connections
+        instead of reconnecting. Retries stay in retry_api_call, so the adapter's
+        own retries are disabled.
+        
+        Returns:
+            The configured session
+        """
+        session = getattr(self.api, '_session', None)
+        if session is None:
+            session = requests.Session()
+            self.api._session = session
+        
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['Connection'] = 'keep-alive'
+        
+        # Decode response bodies with orjson; the REST client calls resp.json()
+        session.hooks['response'].append(self._use_orjson)
+        
+        # Don't leave pooled sockets open at interpreter exit
+        atexit.register(session.close)
+        return session
+    
+    @staticmethod
+    def _use_orjson(response: requests.Response, *args: Any, **kwargs: Any) -> requests.Response:
+        """
+        Response hook that makes response.json() decode with orjson
+        
+        Bars responses can be several MB, and orjson parses them a few times faster
+        than the stdlib decoder requests uses. Only responses from this session are
+        affected, unlike overriding json.loads globally.
+        
+        Args:
+            response: Response received by the session
+            
+        Returns:
+            The same response
+        """
+        response.json = lambda **_: orjson.loads(response.content)  # type: ignore[method-assign]
+        return response
+    
+    def close(self):
+        """Close the pooled HTTP connections"""
+        self.session.close()
+    
+    def retry_api_call(
+        self,
+        func: Callable[..., T],
+        *args: Any,
+        max_retries: Optional[int] = None,
+        **kwargs: Any
+    ) -> Optional[T]:
         """
         Retry an API call with exponential backoff
         
+        Waits use decorrelated jitter (each sleep is drawn between the base and
+        three times the previous sleep), so clients throttled at the same moment
+        don't retry in lockstep. HTTP errors other than rate limiting and server
+        errors are not retried, and retrying stops once RETRY_DEADLINE has passed.
+        
+        After BREAKER_THRESHOLD consecutive calls have failed every retry, calls
+        return None without touching the API for BREAKER_COOLDOWN seconds.
+        
         Args:
-            func: Function to call
+            func: Function to call, e.g. a bound REST method
+            *args: Positional arguments for func
             max_retries: Maximum number of retries (defaults to self.max_retries)
+            **kwargs: Keyword arguments for func
             
         Returns:
             Result of the function call or None if all retries failed
         """
+        if self._breaker_open_until and time.monotonic() < self._breaker_open_until:
+            log.debug("Circuit breaker open, skipping API call")
+            return None
+        
         max_retries = max_retries or self.max_retries
+        deadline = time.monotonic() + RETRY_DEADLINE
+        delay: float = self.retry_delay_base
         
         for retry_count in range(max_retries):
             try:
-                return func()
+                result = func(*args, **kwargs)
+                with self._breaker_lock:
+                    self._consecutive_failures = 0
+                    self._breaker_open_until = 0.0
+                return result
             except Exception as e:
                 log.warning(f"API call failed (attempt {retry_count+1}/{max_retries}): {e}")
                 
-                if retry_count == max_retries - 1:
-                    log.error(f"API call failed after {max_retries} retries")
+                # Errors without a status (connection failures, timeouts) are retried
+                status_code = getattr(e, 'status_code', None)
+                if status_code is not None and status_code not in RETRY_STATUSES:
+                    log.error(f"API call failed with status {status_code}, not retrying")
                     log.error_event("api_call_failed", {
                         "error": str(e),
-                        "retries": max_retries
+                        "status_code": status_code,
+                        "retries": retry_count
                     })
                     return None
                 
-                # Exponential backoff
-                wait_time = self.retry_delay_base ** retry_count
-                log.info(f"Retrying in {wait_time} seconds...")
+                # Exponential backoff with decorrelated jitter, bounded by the deadline
+                delay = min(MAX_RETRY_DELAY, random.uniform(self.retry_delay_base, delay * 3))
+                wait_time = min(delay, deadline - time.monotonic())
+                
+                if retry_count == max_retries - 1 or wait_time <= 0:
+                    log.error(f"API call failed after {retry_count+1} attempts")
+                    log.error_event("api_call_failed", {
+                        "error": str(e),
+                        "retries": retry_count + 1
+                    })
+                    self._record_exhausted_call()
+                    return None
+                
+                log.info(f"Retrying in {wait_time:.1f} seconds...")
                 time.sleep(wait_time)
         
         return None
     
+    def _record_exhausted_call(self):
+        """Count a call that failed every retry, opening the breaker at the threshold"""
+        with self._breaker_lock:
+            self._consecutive_failures += 1
+            failures = self._consecutive_failures
+            if failures < BREAKER_THRESHOLD:
+                return
+            self._breaker_open_until = time.monotonic() + BREAKER_COOLDOWN
+        
+        log.error(f"{failures} consecutive API calls failed, pausing calls for {BREAKER_COOLDOWN} seconds")
+        log.error_event("breaker_open", {
+            "consecutive_failures": failures,
+            "cooldown_seconds": BREAKER_COOLDOWN
+        })
+    
     def verify_connection(self) -> bool:
         """
         Verify the connection to Alpaca API by checking account
@@ -108,7 +240,7 @@ class AlpacaClient:
             True if connection successful, False otherwise
         """
         try:
-            account = self.retry_api_call(lambda: self.api.get_account())
+            account = self.retry_api_call(self.api.get_account)
             if account:
                 log.info(f"Alpaca connection verified. Account status: {account.status}")
                 log.info_event("connection_success", {
@@ -131,7 +263,7 @@ class AlpacaClient:
         limit: int = 100,
         feed: Optional[str] = None,
         **kwargs
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[pd.DataFrame]:
         """
         Get historical price bars with retry logic
         
@@ -145,13 +277,7 @@ class AlpacaClient:
         Returns:
             DataFrame with bars or None if failed
         """
-        params = {'limit': limit, 'timeframe': timeframe, **kwargs}
-        if feed:
-            params['feed'] = feed
-            
-        log.debug(f"Getting {limit} {timeframe} bars for {symbol} using feed: {feed or 'default'}")
-        
-        result = self.retry_api_call(lambda: self.api.get_bars(symbol, **params).df)
+        result = self.get_bars_batch([symbol], timeframe=timeframe, limit=limit, feed=feed, **kwargs).get(symbol)
         
         if result is not None and not result.empty:
             log.info(f"Got {len(result)} {timeframe} bars for {symbol}")
@@ -160,6 +286,63 @@ class AlpacaClient:
             log.warning(f"No bars returned for {symbol}")
             return None
     
+    def get_bars_batch(
+        self,
+        symbols: List[str],
+        timeframe: str = '1H',
+        limit: int = 100,
+        feed: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Get historical price bars for several symbols in one request, with retry logic
+        
+        Args:
+            symbols: Stock symbols
+            timeframe: Bar timeframe (e.g. 1D, 1H, 15Min)
+            limit: Maximum number of bars to retrieve per symbol
+            feed: Data feed to use (None=default, 'sip', 'iex')
+            **kwargs: Additional arguments to pass to get_bars
+            
+        Returns:
+            Dictionary of DataFrames keyed by symbol; symbols without bars are absent
+        """
+        params = {'limit': limit, 'timeframe': timeframe, **kwargs}
+        if len(symbols) > 1:
+            # The API's limit is the total across all symbols and pages run symbol by symbol,
+            # so a shared limit starves the later symbols: bound the window by time instead
+            # and let get_bars read every page
+            if not params.get('start'):
+                params['start'] = lookback_start(timeframe, limit, params.get('end'))
+            params['limit'] = None if params['start'] else limit * len(symbols)
+        if feed:
+            params['feed'] = feed
+            
+        log.debug("Getting %d %s bars for %d symbols using feed: %s", limit, timeframe, len(symbols), feed or 'default')
+        
+        bars = self.retry_api_call(self.api.get_bars, symbols, **params)
+        if bars is None:
+            return {}
+        
+        # get_bars has already fetched every page; building the frame is local work
+        result = bars.df
+        if result.empty:
+            return {}
+        
+        # Multi-symbol responses carry the symbol as a column (or index level); bars are
+        # oldest first, so each symbol keeps its newest limit rows
+        if 'symbol' in result.columns:
+            return {
+                sym: df.drop(columns='symbol').iloc[-limit:]
+                for sym, df in result.groupby('symbol', sort=False)
+            }
+        if 'symbol' in result.index.names:
+            return {
+                sym: df.droplevel('symbol').iloc[-limit:]
+                for sym, df in result.groupby(level='symbol', sort=False)
+            }
+        return {symbols[0]: result.iloc[-limit:]} if len(symbols) == 1 else {}
+    
     def submit_order(
         self,
         symbol: str,
@@ -200,14 +383,15 @@ class AlpacaClient:
             "time_in_force": time_in_force,
         })
         
-        order = self.retry_api_call(lambda: self.api.submit_order(
+        order = self.retry_api_call(
+            self.api.submit_order,
             symbol=symbol,
             qty=qty,
             side=side,
             type=order_type,
             time_in_force=time_in_force,
             **kwargs
-        ))
+        )
         
         if order:
             log.info(f"Order submitted: ID={order.id}, Symbol={symbol}, Qty={qty}, Side={side}")
@@ -239,7 +423,7 @@ class AlpacaClient:
             Position object or None if no position or failed
         """
         try:
-            position = self.retry_api_call(lambda: self.api.get_position(symbol))
+            position = self.retry_api_call(self.api.get_position, symbol)
             if position:
                 log.info(f"Found position: {position.qty} shares of {symbol}")
                 return position
@@ -270,7 +454,7 @@ class AlpacaClient:
         Returns:
             Account object or None if failed
         """
-        return self.retry_api_call(lambda: self.api.get_account())
+        return self.retry_api_call(self.api.get_account)
 
 # Convenience function to create a client
 def create_client(
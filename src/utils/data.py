@@ -4,32 +4,88 @@ Prometheus Trading Bot - Data Utilities
 Enhanced market data fetching with multiple feed sources and fallback mechanisms
 """
 
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Union
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
 
+import numpy as np
+import orjson
 import pandas as pd
 
 from src.utils import logging as log
-from src.utils.api import AlpacaClient
+from src.utils.api import POOL_MAXSIZE, AlpacaClient
+from src.utils.timeframe import lookback_start
+
+# Seconds a fetched bar window is served from cache before new bars are requested
+CACHE_TTL = {'1Min': 1, '2Min': 2, '5Min': 5, '15Min': 15, '30Min': 30, '1H': 30, '1D': 300}
+DEFAULT_CACHE_TTL = 30
+
+# Most bars requested per symbol in one call (alpaca-trade-api pages internally)
+MAX_BARS_PER_REQUEST = 10000
+
+# Maximum concurrent requests while probing feed/timeframe combinations
+MAX_PROBE_WORKERS = 16
+
+# Data feeds in priority order (None = Alpaca's default feed)
+_FEED_ORDER: Tuple[Optional[str], ...] = ('sip', None, 'iex')
+
+# Coarser timeframes to fall back to, in order, when a timeframe lacks data
+_TIMEFRAME_FALLBACKS: Mapping[str, Tuple[str, ...]] = {
+    '1Min': ('2Min', '5Min', '15Min', '30Min', '1H', '1D'),
+    '2Min': ('5Min', '15Min', '30Min', '1H', '1D'),
+    '5Min': ('15Min', '30Min', '1H', '1D'),
+    '15Min': ('30Min', '1H', '1D'),
+    '30Min': ('1H', '1D'),
+    '1H': ('1D',),
+    '1D': ()  # No fallback for daily
+}
 
 class MarketDataFetcher:
     """
     Enhanced market data fetcher with multiple data sources and fallback mechanisms
     """
     
-    def __init__(self, client: AlpacaClient):
+    def __init__(
+        self,
+        client: AlpacaClient,
+        feed_preferences_file: Optional[Union[str, Path]] = 'cache/feed_preferences.json'
+    ):
         """
         Initialize the market data fetcher
         
         Args:
             client: AlpacaClient instance
+            feed_preferences_file: JSON file used to persist the last working feed
+                per symbol and timeframe (None disables)
         """
         self.client = client
-        self.data_stats = {
+        
+        # Guards the cache, feed preferences and stats, which get_bars_many_async
+        # updates from worker threads; _save_lock keeps preference writes in order
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        
+        # (symbol, timeframe) -> feed that last returned enough bars, tried first next time
+        self.feed_preferences_file = Path(feed_preferences_file) if feed_preferences_file else None
+        self._preferred_feed: Dict[Tuple[str, str], Optional[str]] = self._load_feed_preferences()
+        self._preferences_dirty = False
+        self._deferred_saves = 0  # While non-zero, preference changes are saved later in one write
+        
+        # (symbol, timeframe) -> (monotonic fetch time, feed, standardized bars)
+        self._cache: Dict[Tuple[str, str], Tuple[float, Optional[str], pd.DataFrame]] = {}
+        
+        self.data_stats: Dict[str, Any] = {
             "attempts": 0,
             "successes": 0,
-            "feed_successes": {"sip": 0, "default": 0, "iex": 0},
-            "timeframe_successes": {},
+            "cache_hits": 0,
+            "feed_successes": Counter({"sip": 0, "default": 0, "iex": 0}),
+            "timeframe_successes": Counter(),
             "last_successful_fetch": None
         }
     
@@ -43,8 +99,10 @@ class MarketDataFetcher:
         """
         Get historical price bars with enhanced fallback mechanisms
         
-        This method tries multiple data feeds and implements pagination
-        and timeframe fallbacks if necessary
+        This method tries multiple data feeds and implements timeframe
+        fallbacks if necessary. Bars fetched within the last
+        CACHE_TTL seconds are served from cache; older cached bars are topped
+        up with only the bars since the last cached one.
         
         Args:
             symbol: Stock symbol
@@ -55,117 +113,469 @@ class MarketDataFetcher:
         Returns:
             DataFrame with historical bars or None if all attempts failed
         """
-        self.data_stats["attempts"] += 1
+        with self._lock:
+            self.data_stats["attempts"] += 1
         min_required_bars = min_required_bars or lookback_bars
+        best_bar_count = 0
         
-        # Parameter setup
-        params = {'limit': min(1000, lookback_bars), 'timeframe': timeframe}
-        
-        # Try multiple feed sources in priority order
-        feeds_to_try = ['sip', None, 'iex']  # None = Alpaca's default feed
-        
-        for feed in feeds_to_try:
-            try:
+        # Walk the fallback plan in order and return the first window with enough bars
+        plan = self._fallback_plan(timeframe, lookback_bars, min_required_bars)
+        for step, (plan_timeframe, plan_lookback) in enumerate(plan):
+            if step:
+                self._log_fallback(symbol, plan[step - 1], (plan_timeframe, plan_lookback))
+            
+            cached = self._get_cached_bars(symbol, plan_timeframe, min_required_bars)
+            if cached is not None:
+                return cached.iloc[-plan_lookback:]
+            
+            # Try multiple feed sources in priority order, last working feed first
+            for feed in self._feed_order(symbol, plan_timeframe):
                 feed_name = feed or 'default'
+                fetch_start = time.monotonic()
                 
-                if feed:
-                    params['feed'] = feed
-                elif 'feed' in params:
-                    del params['feed']
+                bars_df = self._fetch_from_feed(symbol, plan_lookback, plan_timeframe, feed)
+                if bars_df is None:
+                    self._forget_feed(symbol, plan_timeframe, feed)
+                    continue
                 
-                log.debug(f"Fetching {lookback_bars} {timeframe} bars for {symbol} using feed: {feed_name}")
-                
-                fetch_start = datetime.now()
-                
-                # Initial data fetch
-                bars_df = self.client.get_bars(symbol, **params)
-                
-                # If we didn't get enough bars and need pagination
-                if bars_df is not None and not bars_df.empty and len(bars_df) < lookback_bars:
-                    log.info(f"Initial fetch returned only {len(bars_df)} bars, attempting pagination...")
+                # Check if we have enough data
+                if len(bars_df) < min_required_bars:
+                    self._forget_feed(symbol, plan_timeframe, feed)
+                    best_bar_count = max(best_bar_count, len(bars_df))
+                    log.warning(f"Feed {feed_name} returned only {len(bars_df)} bars (need {min_required_bars}), trying next feed...")
                     
-                    log.info_event("pagination_attempt", {
+                    log.warning_event("insufficient_data", {
                         "symbol": symbol,
-                        "initial_bars": len(bars_df),
-                        "timeframe": timeframe,
+                        "bar_count": len(bars_df),
+                        "needed_bars": min_required_bars,
+                        "timeframe": plan_timeframe,
                         "feed": feed_name
                     })
-                    
-                    # Get oldest timestamp from current data to use as end parameter
-                    oldest_ts = bars_df.index.min()
-                    
-                    # Try pagination to get more historical data
-                    pagination_params = params.copy()
-                    pagination_params['end'] = oldest_ts
-                    more_bars_df = self.client.get_bars(symbol, **pagination_params)
-                    
-                    # Combine dataframes if we got more data
-                    if more_bars_df is not None and not more_bars_df.empty:
-                        bars_df = pd.concat([more_bars_df, bars_df])
-                        bars_df = bars_df[~bars_df.index.duplicated(keep='first')]  # Remove duplicates
-                        log.info(f"Pagination successful, now have {len(bars_df)} bars")
-                        
-                        log.info_event("pagination_success", {
-                            "symbol": symbol,
-                            "additional_bars": len(more_bars_df),
-                            "total_bars": len(bars_df),
-                            "timeframe": timeframe,
-                            "feed": feed_name
-                        })
+                    continue
                 
-                # If we got data, process it
-                if bars_df is not None and not bars_df.empty:
-                    # Standardize index
-                    bars_df = self._standardize_dataframe(bars_df, symbol)
+                log.info(f"Fetched {len(bars_df)} {plan_timeframe} bars for {symbol} using feed: {feed_name}")
+                with self._lock:
+                    self._cache[(symbol, plan_timeframe)] = (time.monotonic(), feed, bars_df)
                     
-                    if bars_df is None:
-                        continue  # Try next feed if standardization failed
-                    
-                    # Check if we have enough data
-                    if len(bars_df) >= min_required_bars:
-                        fetch_time = (datetime.now() - fetch_start).total_seconds()
-                        log.info(f"Fetched {len(bars_df)} {timeframe} bars for {symbol} using feed: {feed_name}")
-                        
-                        # Update stats
-                        self.data_stats["successes"] += 1
-                        self.data_stats["feed_successes"][feed_name] = self.data_stats["feed_successes"].get(feed_name, 0) + 1
-                        self.data_stats["timeframe_successes"][timeframe] = self.data_stats["timeframe_successes"].get(timeframe, 0) + 1
-                        self.data_stats["last_successful_fetch"] = datetime.now().isoformat()
-                        
-                        log.info_event("data_fetch_success", {
-                            "symbol": symbol,
-                            "bar_count": len(bars_df),
-                            "timeframe": timeframe,
-                            "feed": feed_name,
-                            "fetch_time_seconds": fetch_time,
-                            "date_range": {
-                                "start": bars_df.index.min().isoformat(),
-                                "end": bars_df.index.max().isoformat()
-                            }
-                        })
-                        
-                        return bars_df
-                    else:
-                        log.warning(f"Feed {feed_name} returned only {len(bars_df)} bars (need {min_required_bars}), trying next feed...")
-                        
-                        log.warning_event("insufficient_data", {
-                            "symbol": symbol,
-                            "bar_count": len(bars_df),
-                            "needed_bars": min_required_bars,
-                            "timeframe": timeframe,
-                            "feed": feed_name
-                        })
+                    # Update stats
+                    stats = self.data_stats
+                    stats["successes"] += 1
+                    stats["feed_successes"][feed_name] += 1
+                    stats["timeframe_successes"][plan_timeframe] += 1
+                    stats["last_successful_fetch"] = datetime.now().isoformat()
+                self._remember_feed(symbol, plan_timeframe, feed)
+                
+                # Only build the event (timing, date formatting) if it will be emitted
+                if log.is_enabled_for(logging.INFO):
+                    log.info_event("data_fetch_success", {
+                        "symbol": symbol,
+                        "bar_count": len(bars_df),
+                        "timeframe": plan_timeframe,
+                        "feed": feed_name,
+                        "fetch_time_seconds": time.monotonic() - fetch_start,
+                        "date_range": {
+                            "start": bars_df.index.min().isoformat(),
+                            "end": bars_df.index.max().isoformat()
+                        }
+                    })
+                
+                return bars_df
+        
+        # If we get here, all fallbacks failed
+        log.error(f"Failed to fetch sufficient data for {symbol} across all feeds and fallbacks")
+        log.error_event("data_fetch_complete_failure", {
+            "symbol": symbol,
+            "best_bar_count": best_bar_count,
+            "attempts": self.data_stats["attempts"],
+            "success_rate": self.data_stats["successes"] / self.data_stats["attempts"] if self.data_stats["attempts"] > 0 else 0
+        })
+        
+        return None
+    
+    def get_bars_ndarray(
+        self,
+        symbol: str,
+        lookback_bars: int = 100,
+        timeframe: str = '1H',
+        min_required_bars: Optional[int] = None
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Get historical price bars as NumPy arrays for indicator code
+        
+        Same fetch, cache and fallbacks as get_bars. Prices are float32, which
+        halves the memory traffic of indicator loops; its ~7 significant digits
+        are exact to the cent for prices below about 1e5.
+        
+        Args:
+            symbol: Stock symbol
+            lookback_bars: Number of bars to fetch
+            timeframe: Bar timeframe (e.g. 1D, 1H, 15Min)
+            min_required_bars: Minimum number of bars required (defaults to lookback_bars)
+            
+        Returns:
+            Tuple of (int64 UTC nanosecond timestamps, float32 array of shape
+            (n, 5) with open/high/low/close/volume columns) or None if all attempts failed
+        """
+        bars_df = self.get_bars(symbol, lookback_bars, timeframe, min_required_bars)
+        if bars_df is None:
+            return None
+        
+        return bars_df.index.as_unit('ns').asi8, bars_df.to_numpy(dtype=np.float32)
+    
+    def _feed_order(self, symbol: str, timeframe: str) -> Tuple[Optional[str], ...]:
+        """Feeds to try for a symbol and timeframe, the last working one first"""
+        key = (symbol, timeframe)
+        with self._lock:
+            if key not in self._preferred_feed:
+                return _FEED_ORDER
+            preferred = self._preferred_feed[key]
+        
+        return (preferred,) + tuple(feed for feed in _FEED_ORDER if feed != preferred)
+    
+    def _remember_feed(self, symbol: str, timeframe: str, feed: Optional[str]):
+        """Record the feed that returned enough bars, persisting it if it changed"""
+        key = (symbol, timeframe)
+        with self._lock:
+            if key in self._preferred_feed and self._preferred_feed[key] == feed:
+                return
+            self._preferred_feed[key] = feed
+            self._preferences_dirty = True
+        
+        self._save_feed_preferences()
+    
+    def _forget_feed(self, symbol: str, timeframe: str, feed: Optional[str]):
+        """Drop a preferred feed that no longer returns enough bars"""
+        key = (symbol, timeframe)
+        with self._lock:
+            if key not in self._preferred_feed or self._preferred_feed[key] != feed:
+                return
+            del self._preferred_feed[key]
+            self._preferences_dirty = True
+        
+        self._save_feed_preferences()
+    
+    def _load_feed_preferences(self) -> Dict[Tuple[str, str], Optional[str]]:
+        """Read persisted feed preferences (stored keyed by symbol/timeframe)"""
+        if not self.feed_preferences_file or not self.feed_preferences_file.exists():
+            return {}
+        
+        try:
+            stored = orjson.loads(self.feed_preferences_file.read_bytes())
+            return {tuple(key.split('/', 1)): feed for key, feed in stored.items()}
+        except (OSError, ValueError) as e:
+            log.warning(f"Ignoring unreadable feed preferences {self.feed_preferences_file}: {e}")
+            return {}
+    
+    def _save_feed_preferences(self):
+        """
+        Persist feed preferences so the next run starts with the working feeds
+        
+        The preferences are snapshotted under the lock and written to a temporary
+        file that replaces the old one, so a concurrent change or an interrupted
+        write can't leave a truncated file behind.
+        """
+        if not self.feed_preferences_file:
+            return
+        
+        with self._save_lock:
+            with self._lock:
+                if self._deferred_saves or not self._preferences_dirty:
+                    return
+                payload = orjson.dumps(
+                    {f"{symbol}/{timeframe}": feed for (symbol, timeframe), feed in self._preferred_feed.items()}
+                )
+                self._preferences_dirty = False
+            
+            try:
+                self.feed_preferences_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.feed_preferences_file.with_name(self.feed_preferences_file.name + '.tmp')
+                tmp_file.write_bytes(payload)
+                tmp_file.replace(self.feed_preferences_file)
+            except OSError as e:
+                log.warning(f"Could not save feed preferences to {self.feed_preferences_file}: {e}")
+                with self._lock:
+                    self._preferences_dirty = True
+    
+    def _log_fallback(self, symbol: str, previous: Tuple[str, int], current: Tuple[str, int]):
+        """Log the move from one fallback plan step to the next"""
+        if previous[0] != current[0]:
+            log.warning(f"Could not get enough {previous[0]} bars, falling back to {current[0]}...")
+            log.warning_event("timeframe_fallback", {
+                "symbol": symbol,
+                "from_timeframe": previous[0],
+                "to_timeframe": current[0]
+            })
+        else:
+            log.warning(f"Could not get enough daily bars, reducing request size to {current[1]}...")
+            log.warning_event("request_size_reduction", {
+                "symbol": symbol,
+                "from_size": previous[1],
+                "to_size": current[1]
+            })
+    
+    def _fallback_plan(self, timeframe: str, lookback_bars: int, min_required_bars: int) -> List[Tuple[str, int]]:
+        """
+        Build the ordered (timeframe, lookback) attempts for a request
+        
+        Each timeframe falls back to the next coarser one until daily bars; for
+        daily bars a request for more than 100 bars is finally retried smaller.
+        
+        Args:
+            timeframe: Requested timeframe
+            lookback_bars: Requested number of bars
+            min_required_bars: Minimum number of bars required
+            
+        Returns:
+            List of (timeframe, lookback_bars) pairs to try in order
+        """
+        plan = [(tf, lookback_bars) for tf in (timeframe,) + _TIMEFRAME_FALLBACKS.get(timeframe, ())]
+        
+        # For daily timeframe, try with fewer bars as last resort
+        if plan[-1][0] == '1D' and lookback_bars > 100:
+            plan.append(('1D', min(100, min_required_bars)))
+        
+        return plan
+    
+    def _fetch_from_feed(
+        self,
+        symbol: str,
+        lookback_bars: int,
+        timeframe: str,
+        feed: Optional[str]
+    ) -> Optional[pd.DataFrame]:
+        """
+        Fetch bars from one feed in a single call
+        
+        The whole lookback is requested at once (up to MAX_BARS_PER_REQUEST);
+        alpaca-trade-api follows the API's page tokens itself, so no follow-up
+        request for older bars is needed.
+        
+        Args:
+            symbol: Stock symbol
+            lookback_bars: Number of bars to fetch
+            timeframe: Bar timeframe
+            feed: Data feed to use (None=default)
+            
+        Returns:
+            Standardized DataFrame, or None if the feed returned nothing usable
+        """
+        feed_name = feed or 'default'
+        
+        # Parameter setup
+        params = {'limit': min(MAX_BARS_PER_REQUEST, lookback_bars), 'timeframe': timeframe}
+        if feed:
+            params['feed'] = feed
+        
+        try:
+            log.debug("Fetching %d %s bars for %s using feed: %s", lookback_bars, timeframe, symbol, feed_name)
+            
+            bars_df = self.client.get_bars(symbol, **params)
+            if bars_df is None or bars_df.empty:
+                return None
+            
+            # Standardize index (None if it failed, so the next feed is tried)
+            return self._standardize_dataframe(bars_df, symbol)
+        except Exception as e:
+            log.error(f"Error fetching {timeframe} bars for {symbol} using feed {feed_name}: {str(e)}")
+            log.error_event("data_fetch_error", {
+                "symbol": symbol,
+                "feed": feed_name,
+                "timeframe": timeframe,
+                "error": str(e)
+            })
+            return None
+    
+    def _get_cached_bars(self, symbol: str, timeframe: str, min_required_bars: int) -> Optional[pd.DataFrame]:
+        """
+        Get cached bars for a symbol, fetching only new bars once the TTL has passed
+        
+        The API returns the oldest bars after start, so the refresh never starts
+        before the window the cached bars cover; if the delta still comes back
+        full, newer bars may be missing and a full fetch is requested instead.
+        
+        Args:
+            symbol: Stock symbol
+            timeframe: Bar timeframe
+            min_required_bars: Minimum number of bars required
+            
+        Returns:
+            Cached (and possibly topped-up) bars, or None if a full fetch is needed
+        """
+        entry = self._cache.get((symbol, timeframe))
+        if entry is None:
+            return None
+        
+        fetched_at, feed, cached_df = entry
+        if len(cached_df) < min_required_bars:
+            return None
+        
+        now = time.monotonic()
+        if now - fetched_at < CACHE_TTL.get(timeframe, DEFAULT_CACHE_TTL):
+            with self._lock:
+                self.data_stats["cache_hits"] += 1
+            return cached_df
+        
+        # Conditional refetch: request only bars from the last cached one onwards
+        # (on the feed that served the cache) and let them supersede overlapping rows
+        since = cached_df.index.max()
+        window_start = lookback_start(timeframe, len(cached_df))
+        if window_start:
+            since = max(since, pd.Timestamp(window_start))
+        try:
+            new_df = self.client.get_bars(
+                symbol, timeframe=timeframe, limit=MAX_BARS_PER_REQUEST, feed=feed, start=since.isoformat()
+            )
+        except Exception as e:
+            log.warning(f"Error refreshing cached {timeframe} bars for {symbol}: {str(e)}")
+            return None
+        
+        if new_df is not None and len(new_df) >= MAX_BARS_PER_REQUEST:
+            log.debug("Refresh of cached %s bars for %s came back full, fetching in full", timeframe, symbol)
+            return None
+        
+        if new_df is not None and not new_df.empty:
+            new_df = self._standardize_dataframe(new_df, symbol)
+            if new_df is None:
+                return None
+            
+            # Both are sorted, so cached rows before the first new bar are all that's kept
+            cached_df = pd.concat([cached_df[cached_df.index < new_df.index[0]], new_df]).iloc[-len(cached_df):]
+        
+        with self._lock:
+            self._cache[(symbol, timeframe)] = (now, feed, cached_df)
+        return cached_df
+    
+    def invalidate_cache(self, symbol: Optional[str] = None):
+        """
+        Drop cached bars so the next request fetches them in full
+        
+        Args:
+            symbol: Symbol to drop (all symbols if None)
+        """
+        with self._lock:
+            if symbol is None:
+                self._cache.clear()
+            else:
+                for key in [key for key in self._cache if key[0] == symbol]:
+                    del self._cache[key]
+    
+    def get_bars_many(
+        self,
+        symbols: List[str],
+        lookback_bars: int = 100,
+        timeframe: str = '1H',
+        min_required_bars: Optional[int] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Get historical price bars for several symbols with one request per feed
+        
+        Each feed is asked for all symbols still lacking data in a single batched
+        call. Symbols that no feed can satisfy go through get_bars, which adds
+        timeframe fallbacks.
+        
+        Args:
+            symbols: Stock symbols
+            lookback_bars: Number of bars to fetch per symbol
+            timeframe: Bar timeframe (e.g. 1D, 1H, 15Min)
+            min_required_bars: Minimum number of bars required (defaults to lookback_bars)
+            
+        Returns:
+            Dictionary of DataFrames keyed by symbol; symbols without data are absent
+        """
+        min_required_bars = min_required_bars or lookback_bars
+        results = {}
+        pending = []
+        for symbol in symbols:
+            cached = self._get_cached_bars(symbol, timeframe, min_required_bars)
+            if cached is not None:
+                results[symbol] = cached.iloc[-lookback_bars:]
+            else:
+                pending.append(symbol)
+        
+        for feed in _FEED_ORDER:
+            if not pending:
+                break
+            
+            feed_name = feed or 'default'
+            try:
+                frames = self.client.get_bars_batch(
+                    pending, timeframe=timeframe, limit=min(MAX_BARS_PER_REQUEST, lookback_bars), feed=feed
+                )
             except Exception as e:
-                log.error(f"Error fetching {timeframe} bars for {symbol} using feed {feed or 'default'}: {str(e)}")
-                log.error_event("data_fetch_error", {
-                    "symbol": symbol,
-                    "feed": feed or 'default',
-                    "timeframe": timeframe,
-                    "error": str(e)
-                })
-        
-        # Fallback to different timeframe if all feeds failed
-        return self._try_timeframe_fallbacks(symbol, lookback_bars, timeframe, min_required_bars)
+                log.error(f"Error fetching {timeframe} bars for {len(pending)} symbols using feed {feed_name}: {str(e)}")
+                continue
+            
+            for symbol, bars_df in frames.items():
+                bars_df = self._standardize_dataframe(bars_df, symbol)
+                if bars_df is not None and len(bars_df) >= min_required_bars:
+                    bars_df = bars_df.iloc[-lookback_bars:]
+                    results[symbol] = bars_df
+                    with self._lock:
+                        self._cache[(symbol, timeframe)] = (time.monotonic(), feed, bars_df)
+                        self.data_stats["feed_successes"][feed_name] += 1
+                    self._remember_feed(symbol, timeframe, feed)
+            
+            pending = [symbol for symbol in pending if symbol not in results]
+            log.info(f"Feed {feed_name} satisfied {len(symbols) - len(pending)}/{len(symbols)} symbols")
+        
+        # Symbols left pending are counted by get_bars below
+        batched = len(symbols) - len(pending)
+        with self._lock:
+            stats = self.data_stats
+            stats["attempts"] += batched
+            stats["successes"] += batched
+            if batched:
+                stats["timeframe_successes"][timeframe] += batched
+                stats["last_successful_fetch"] = datetime.now().isoformat()
+        
+        # Per-symbol path for the rest, with timeframe fallbacks
+        for symbol in pending:
+            bars_df = self.get_bars(symbol, lookback_bars, timeframe, min_required_bars)
+            if bars_df is not None:
+                results[symbol] = bars_df
+        
+        return results
+    
+    async def get_bars_many_async(
+        self,
+        symbols: List[str],
+        lookback_bars: int = 100,
+        timeframe: str = '1H',
+        min_required_bars: Optional[int] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Get historical price bars for several symbols concurrently
+        
+        Runs get_bars for each symbol on worker threads and gathers the results,
+        so a scan costs about one round trip per fallback step instead of one per
+        symbol. Concurrency is capped at the client's connection pool size, and
+        feed preference changes from the workers are saved once at the end.
+        
+        Args:
+            symbols: Stock symbols
+            lookback_bars: Number of bars to fetch per symbol
+            timeframe: Bar timeframe (e.g. 1D, 1H, 15Min)
+            min_required_bars: Minimum number of bars required (defaults to lookback_bars)
+            
+        Returns:
+            Dictionary of DataFrames keyed by symbol; symbols without data are absent
+        """
+        semaphore = asyncio.Semaphore(POOL_MAXSIZE)
+        
+        async def fetch(symbol: str) -> Optional[pd.DataFrame]:
+            async with semaphore:
+                return await asyncio.to_thread(self.get_bars, symbol, lookback_bars, timeframe, min_required_bars)
+        
+        with self._lock:
+            self._deferred_saves += 1
+        try:
+            frames = await asyncio.gather(*(fetch(symbol) for symbol in symbols))
+        finally:
+            with self._lock:
+                self._deferred_saves -= 1
+            self._save_feed_preferences()
+        
+        return {symbol: bars_df for symbol, bars_df in zip(symbols, frames) if bars_df is not None}
     
     def _standardize_dataframe(self, df: pd.DataFrame, symbol: str) -> Optional[pd.DataFrame]:
         """
@@ -181,11 +591,11 @@ class MarketDataFetcher:
         required_cols = ['open', 'high', 'low', 'close', 'volume']
         
         try:
-            # Standardize index
+            # Standardize index (API responses are usually UTC already)
             if isinstance(df.index, pd.DatetimeIndex):
                 if df.index.tz is None:
                     df.index = df.index.tz_localize('UTC')
-                else:
+                elif str(df.index.tz) != 'UTC':
                     df.index = df.index.tz_convert('UTC')
             else:
                 df = df.reset_index()
@@ -198,98 +608,47 @@ class MarketDataFetcher:
                     log.error(f"Cannot find timestamp column for {symbol}")
                     return None
             
-            df = df.sort_index()
+            if not df.index.is_monotonic_increasing:
+                df = df.sort_index(kind='mergesort')
+            
+            # Sorted, so duplicate timestamps are adjacent: a linear scan finds them
+            # without hashing the index; the first row of each run is kept
+            ts = df.index.asi8
+            repeated = ts[1:] == ts[:-1]
+            if repeated.any():
+                df = df[np.concatenate(([True], ~repeated))]
             
             # Check required columns
-            if not all(col in df.columns for col in required_cols):
+            if not set(required_cols).issubset(df.columns):
                 log.error(f"Missing required columns for {symbol}")
                 return None
             
-            # Select and convert required columns
-            return df[required_cols].astype(float)
+            # Most feeds already return float64 prices, so usually nothing needs converting
+            bars_df = df.loc[:, required_cols]
+            coerced = False
+            for col in required_cols:
+                column = bars_df[col]
+                if column.dtype == np.float64:
+                    continue
+                if not pd.api.types.is_numeric_dtype(column):
+                    # String-encoded prices from some feeds; unparseable values become NaN
+                    column = pd.to_numeric(column, errors='coerce')
+                    coerced = True
+                bars_df[col] = column.astype(np.float64)
+            
+            if coerced:
+                # Unparseable prices must not count toward min_required_bars, or a bad
+                # feed would stop the caller falling back to the next one
+                bad_prices = bars_df[required_cols[:4]].isna().any(axis=1)
+                if bad_prices.any():
+                    log.warning(f"Dropping {int(bad_prices.sum())} bars with unparseable prices for {symbol}")
+                    bars_df = bars_df[~bad_prices]
+                bars_df['volume'] = bars_df['volume'].fillna(0.0)
+            return bars_df
         except Exception as e:
             log.error(f"Error standardizing DataFrame for {symbol}: {e}")
             return None
     
-    def _try_timeframe_fallbacks(
-        self,
-        symbol: str,
-        lookback_bars: int,
-        timeframe: str,
-        min_required_bars: int
-    ) -> Optional[pd.DataFrame]:
-        """
-        Try fallback timeframes when the primary timeframe fails
-        
-        Args:
-            symbol: Stock symbol
-            lookback_bars: Number of bars to fetch
-            timeframe: Original timeframe that failed
-            min_required_bars: Minimum number of bars required
-            
-        Returns:
-            DataFrame with historical bars or None if all fallbacks failed
-        """
-        # Define fallback paths
-        fallbacks = {
-            '1Min': ['2Min', '5Min', '15Min', '1H', '1D'],
-            '2Min': ['5Min', '15Min', '1H', '1D'],
-            '5Min': ['15Min', '1H', '1D'],
-            '15Min': ['30Min', '1H', '1D'],
-            '30Min': ['1H', '1D'],
-            '1H': ['1D'],
-            '1D': []  # No fallback for daily
-        }
-        
-        # Get fallback options for the current timeframe
-        fallback_options = fallbacks.get(timeframe, [])
-        
-        if not fallback_options:
-            # For daily timeframe, try with fewer bars as last resort
-            if timeframe == '1D' and lookback_bars > 100:
-                reduced_lookback = min(100, min_required_bars)
-                log.warning(f"Could not get enough daily bars, reducing request size to {reduced_lookback}...")
-                
-                log.warning_event("request_size_reduction", {
-                    "symbol": symbol,
-                    "from_size": lookback_bars,
-                    "to_size": reduced_lookback
-                })
-                
-                return self.get_bars(
-                    symbol, 
-                    lookback_bars=reduced_lookback, 
-                    timeframe=timeframe, 
-                    min_required_bars=min_required_bars
-                )
-        else:
-            # Try the next timeframe in the fallback sequence
-            next_timeframe = fallback_options[0]
-            log.warning(f"Could not get enough {timeframe} bars, falling back to {next_timeframe}...")
-            
-            log.warning_event("timeframe_fallback", {
-                "symbol": symbol,
-                "from_timeframe": timeframe,
-                "to_timeframe": next_timeframe
-            })
-            
-            return self.get_bars(
-                symbol, 
-                lookback_bars=lookback_bars, 
-                timeframe=next_timeframe,
-                min_required_bars=min_required_bars
-            )
-        
-        # If we get here, all fallbacks failed
-        log.error(f"Failed to fetch sufficient data for {symbol} across all feeds and fallbacks")
-        log.error_event("data_fetch_complete_failure", {
-            "symbol": symbol,
-            "attempts": self.data_stats["attempts"],
-            "success_rate": self.data_stats["successes"] / self.data_stats["attempts"] if self.data_stats["attempts"] > 0 else 0
-        })
-        
-        return None
-    
     def test_data_feeds(
         self, 
         symbol: str,
@@ -311,7 +670,7 @@ class MarketDataFetcher:
         log.info_event("diagnostic_test_start", {"symbol": symbol})
         
         timeframes = timeframes or ['1D', '1H', '15Min']
-        feeds = ['sip', None, 'iex']
+        feeds = _FEED_ORDER
         
         results = {
             "feed_results": {},
@@ -320,48 +679,40 @@ class MarketDataFetcher:
             "highest_bar_count": 0
         }
         
-        for tf in timeframes:
+        # Probe every combination concurrently; the requests are independent and
+        # each spends nearly all its time waiting on the network
+        probes = [(tf, feed) for tf in timeframes for feed in feeds]
+        with ThreadPoolExecutor(max_workers=min(len(probes), MAX_PROBE_WORKERS)) as executor:
+            futures = {probe: executor.submit(self._probe_feed, symbol, *probe, lookback_bars) for probe in probes}
+        
+        # Tally in the original order so ties resolve the same way as a serial run
+        for (tf, feed), future in futures.items():
             if tf not in results["timeframe_results"]:
                 results["timeframe_results"][tf] = {"success": False, "max_bars": 0}
+            
+            feed_name = feed or "default"
+            if feed_name not in results["feed_results"]:
+                results["feed_results"][feed_name] = {"success": False, "max_bars": 0}
+            
+            bar_count = future.result()
+            if bar_count:
+                # Update results tracking
+                results["feed_results"][feed_name]["success"] = True
+                results["feed_results"][feed_name]["max_bars"] = max(
+                    results["feed_results"][feed_name]["max_bars"], 
+                    bar_count
+                )
                 
-            for feed in feeds:
-                feed_name = feed or "default"
-                if feed_name not in results["feed_results"]:
-                    results["feed_results"][feed_name] = {"success": False, "max_bars": 0}
+                results["timeframe_results"][tf]["success"] = True
+                results["timeframe_results"][tf]["max_bars"] = max(
+                    results["timeframe_results"][tf]["max_bars"], 
+                    bar_count
+                )
                 
-                try:
-                    params = {'limit': lookback_bars, 'timeframe': tf}
-                    if feed:
-                        params['feed'] = feed
-                    
-                    log.info(f"Testing {tf} bars with feed: {feed_name}")
-                    bars_df = self.client.get_bars(symbol, **params)
-                    
-                    if bars_df is not None and not bars_df.empty:
-                        bar_count = len(bars_df)
-                        log.info(f"SUCCESS: Got {bar_count} {tf} bars using {feed_name} feed")
-                        
-                        # Update results tracking
-                        results["feed_results"][feed_name]["success"] = True
-                        results["feed_results"][feed_name]["max_bars"] = max(
-                            results["feed_results"][feed_name]["max_bars"], 
-                            bar_count
-                        )
-                        
-                        results["timeframe_results"][tf]["success"] = True
-                        results["timeframe_results"][tf]["max_bars"] = max(
-                            results["timeframe_results"][tf]["max_bars"], 
-                            bar_count
-                        )
-                        
-                        # Check if this is the best combination so far
-                        if bar_count > results["highest_bar_count"]:
-                            results["highest_bar_count"] = bar_count
-                            results["best_combination"] = {"feed": feed_name, "timeframe": tf}
-                    else:
-                        log.error(f"❌ No data returned for {tf} with {feed_name} feed")
-                except Exception as e:
-                    log.error(f"❌ Error testing {tf} with {feed_name} feed: {str(e)}")
+                # Check if this is the best combination so far
+                if bar_count > results["highest_bar_count"]:
+                    results["highest_bar_count"] = bar_count
+                    results["best_combination"] = {"feed": feed_name, "timeframe": tf}
         
         # Test the enhanced get_bars method
         log.info("Testing enhanced get_bars method:")
@@ -395,4 +746,36 @@ class MarketDataFetcher:
         log.info_event("diagnostic_test_results", results)
         log.info("=== End of Diagnostic Test ===")
         
-        return results 
\ No newline at end of file
+        return results 
+    
+    def _probe_feed(self, symbol: str, timeframe: str, feed: Optional[str], lookback_bars: int) -> int:
+        """
+        Request bars for one feed/timeframe combination (runs on a worker thread)
+        
+        Args:
+            symbol: Stock symbol to test
+            timeframe: Timeframe to test
+            feed: Data feed to test (None=default)
+            lookback_bars: Number of bars to request
+            
+        Returns:
+            Number of bars returned (0 if none or failed)
+        """
+        feed_name = feed or "default"
+        try:
+            params = {'limit': lookback_bars, 'timeframe': timeframe}
+            if feed:
+                params['feed'] = feed
+            
+            log.info(f"Testing {timeframe} bars with feed: {feed_name}")
+            bars_df = self.client.get_bars(symbol, **params)
+            
+            if bars_df is not None and not bars_df.empty:
+                log.info(f"SUCCESS: Got {len(bars_df)} {timeframe} bars using {feed_name} feed")
+                return len(bars_df)
+            
+            log.error(f"❌ No data returned for {timeframe} with {feed_name} feed")
+        except Exception as e:
+            log.error(f"❌ Error testing {timeframe} with {feed_name} feed: {str(e)}")
+        
+        return 0
@@ -4,18 +4,391 @@ Prometheus Trading Bot - Logging Utilities
 Enhanced structured logging with JSON formatting for better analysis
 """
 
-import json
+import atexit
+import functools
+import gzip
 import logging
+import os
+import shutil
+import struct
+import threading
+import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Callable, Deque, Dict, List, Optional, Union
+
+import numpy as np
+import orjson
+
+try:
+    import msgpack
+except ImportError:  # Optional: only needed for the msgpack event file
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # Optional: zstd compression of rotated log files
+    zstandard = None
 
 # Default log format for regular logging
 DEFAULT_LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
 
+# Level names of the convenience methods (debug/debug_event, info/info_event, ...)
+_LEVEL_METHODS = (
+    ("debug", logging.DEBUG),
+    ("info", logging.INFO),
+    ("warning", logging.WARNING),
+    ("error", logging.ERROR),
+    ("critical", logging.CRITICAL)
+)
+
+# NumPy scalars (common in event data) are written as numbers; other unknown types fall back to str()
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+# File handler buffering
+FILE_BUFFER_SIZE = 64 * 1024  # bytes buffered before a write to the log file
+FLUSH_INTERVAL = 0.2  # seconds between periodic flushes of the log file
+
+# Records waiting for the logging thread; the oldest are dropped once it is full
+LOG_QUEUE_SIZE = 10000
+LOG_BATCH_SIZE = 64  # records handled per wakeup of the logging thread
+
+# Structured event encodings for the log file
+EVENT_FORMATS = ("json", "msgpack")
+_FRAME_HEADER = struct.Struct(">I")  # length prefix of each msgpack event
+
+# Log rotation (max_bytes=0 disables it)
+BACKUP_COUNT = 5  # rotated files kept
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}  # codecs for rotated files
+
+def _compress_rotated(codec: str, source: str, dest: str):
+    """Compress a rotated log file into dest and remove the uncompressed original"""
+    with open(source, 'rb') as f_in:
+        if codec == "zstd":
+            with open(dest, 'wb') as f_out, zstandard.ZstdCompressor(level=3).stream_writer(f_out) as writer:
+                shutil.copyfileobj(f_in, writer)
+        else:
+            with gzip.open(dest, 'wb', compresslevel=6) as gz_out:
+                shutil.copyfileobj(f_in, gz_out)
+    os.remove(source)
+
+class BufferedFileHandler(RotatingFileHandler):
+    """
+    File handler that buffers records and flushes on an interval
+    
+    logging.FileHandler flushes after every record, costing a write syscall per
+    line. This handler lets records collect in a FILE_BUFFER_SIZE buffer which a
+    daemon thread flushes every flush_interval seconds. Records at ERROR and
+    above are flushed immediately, and logging.shutdown() flushes the rest at exit.
+    The resulting write syscalls run on the logging thread, never the caller's.
+    
+    With max_bytes set the file is rotated once it reaches that size, and rotated
+    files can be compressed (on the logging thread, so callers don't wait for it).
+    The size is tracked by counting the bytes written, since tell() on a text
+    stream flushes its buffer.
+    """
+    
+    stream: Any  # Text file, or binary for MsgpackEventHandler
+    
+    def __init__(
+        self,
+        filename: Union[str, Path],
+        mode: str = 'a',
+        encoding: Optional[str] = None,
+        buffer_size: int = FILE_BUFFER_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        max_bytes: int = 0,
+        backup_count: int = BACKUP_COUNT,
+        compression: Optional[str] = None
+    ):
+        """
+        Initialize the handler and start the flush thread
+        
+        Args:
+            filename: Path to the log file
+            mode: File open mode
+            encoding: Text encoding of the log file
+            buffer_size: Size of the write buffer in bytes
+            flush_interval: Seconds between periodic flushes
+            max_bytes: Size in bytes at which the file is rotated (0 never rotates)
+            backup_count: Number of rotated files to keep
+            compression: Codec for rotated files ("gzip", "zstd" or None)
+        """
+        if compression is not None and compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"compression must be one of {tuple(COMPRESSION_SUFFIXES)}, got {compression!r}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstandard is required for zstd log compression")
+        
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        
+        # Set by BatchQueueListener: error flushes wait for the end of the batch
+        self.defer_error_flush = False
+        self._flush_pending = False
+        self._bytes_written = 0  # Size of the current file, reset by _open on rollover
+        # Kept here rather than as maxBytes: passing that makes RotatingFileHandler force
+        # text append mode, and emit() does the size check itself
+        self.max_bytes = max_bytes
+        super().__init__(filename, mode=mode, backupCount=backup_count, encoding=encoding)
+        
+        if compression:
+            suffix = COMPRESSION_SUFFIXES[compression]
+            self.namer = lambda name: name + suffix
+            self.rotator = lambda source, dest: _compress_rotated(compression, source, dest)
+        
+        self._stop_flushing = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="log-flusher", daemon=True)
+        self._flusher.start()
+    
+    def _open(self):
+        """Open the log file with a larger write buffer, starting the size count at its length"""
+        stream = open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                      encoding=self.encoding, errors=self.errors)
+        self._bytes_written = os.path.getsize(self.baseFilename) if 'a' in self.mode else 0
+        return stream
+    
+    def _encode(self, record: logging.LogRecord) -> Optional[Union[str, bytes]]:
+        """Data to write for a record, or None to skip it"""
+        return self.format(record) + self.terminator
+    
+    def emit(self, record: logging.LogRecord):
+        """Write a record to the buffer, flushing only for errors"""
+        try:
+            data = self._encode(record)
+            if data is None:
+                return
+            
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(data)
+            
+            # Size check after the write, so the record isn't formatted twice
+            if self.max_bytes:
+                if isinstance(data, bytes) or data.isascii():
+                    self._bytes_written += len(data)
+                else:
+                    self._bytes_written += len(data.encode(self.stream.encoding, self.stream.errors))
+                if self._bytes_written >= self.max_bytes:
+                    self.doRollover()
+            elif record.levelno >= logging.ERROR:
+                if self.defer_error_flush:
+                    self._flush_pending = True
+                else:
+                    self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+    
+    def flush_pending(self):
+        """Flush if a deferred error record is waiting in the buffer"""
+        if self._flush_pending:
+            self._flush_pending = False
+            self.flush()
+    
+    def _flush_periodically(self):
+        """Flush the buffer every flush_interval seconds until the handler is closed"""
+        while not self._stop_flushing.wait(self.flush_interval):
+            self.flush()
+    
+    def close(self):
+        """Stop the flush thread, then flush and close the file"""
+        self._stop_flushing.set()
+        super().close()
+
+def _msgpack_default(obj: Any) -> Any:
+    """Convert values msgpack can't encode: datetimes to ISO strings, NumPy arrays and scalars to Python"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, np.ndarray):
+        # Checked before .item(), which only works on single-element arrays
+        return obj.tolist()
+    if hasattr(obj, "item"):
+        return obj.item()
+    return str(obj)
+
+class MsgpackEventHandler(BufferedFileHandler):
+    """
+    Buffered handler that writes structured events to a binary MessagePack file
+    
+    Only records carrying an "event" attribute (set by structured_log) are
+    written. Each event is framed with a 4-byte big-endian length prefix so the
+    file can be read back as a stream.
+    """
+    
+    def __init__(self, filename: Union[str, Path], **kwargs: Any):
+        """
+        Initialize the handler
+        
+        Args:
+            filename: Path to the event file
+            **kwargs: Buffering and rotation options passed to BufferedFileHandler
+        """
+        if msgpack is None:
+            raise ImportError("msgpack is required for the msgpack event format")
+        super().__init__(filename, mode='ab', **kwargs)
+        self._packer = msgpack.Packer(default=_msgpack_default, use_bin_type=True)
+    
+    def _encode(self, record: logging.LogRecord) -> Optional[bytes]:
+        """The record's event as a length-prefixed frame"""
+        event = getattr(record, "event", None)
+        if event is None:
+            return None
+        
+        # The packer reuses its internal buffer between events; the frame is then
+        # copied into the file buffer, so nothing else is allocated per event
+        payload = self._packer.pack(event)
+        return _FRAME_HEADER.pack(len(payload)) + payload
+
+def _is_text_record(record: logging.LogRecord) -> bool:
+    """Filter for handlers that don't show structured events (console, text file in msgpack mode)"""
+    return not hasattr(record, "event")
+
+class FastFormatter(logging.Formatter):
+    """
+    Formatter for DEFAULT_LOG_FORMAT without the generic %-style machinery
+    
+    Produces the same text as logging.Formatter(DEFAULT_LOG_FORMAT), but builds
+    it with one f-string and only calls strftime when the second changes.
+    """
+    
+    def __init__(self):
+        """Initialize the formatter"""
+        super().__init__(DEFAULT_LOG_FORMAT)
+        self._second = -1
+        self._second_text = ""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        """Format a record as "<asctime> - <levelname> - <message>" plus any traceback"""
+        second = int(record.created)
+        if second != self._second:
+            self._second_text = time.strftime(self.default_time_format, self.converter(second))
+            self._second = second
+        
+        text = f"{self._second_text},{int(record.msecs):03d} - {record.levelname} - {record.getMessage()}"
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            text = f"{text}\n{record.exc_text}"
+        if record.stack_info:
+            text = f"{text}\n{self.formatStack(record.stack_info)}"
+        return text
+
+class LogRing:
+    """
+    Bounded log record queue that drops the oldest record when full
+    
+    Built on collections.deque, whose append and popleft are atomic, so producers
+    never take a lock: putting a record is an append plus, only when the logging
+    thread is asleep, setting an event to wake it. A burst of logging can't stall
+    the caller; losing old records is preferred over delaying trading code.
+    """
+    
+    def __init__(self, maxsize: int = LOG_QUEUE_SIZE):
+        """
+        Initialize the ring
+        
+        Args:
+            maxsize: Records held before the oldest are dropped
+        """
+        self._items: Deque[Any] = deque(maxlen=maxsize)
+        self._ready = threading.Event()
+    
+    def put_nowait(self, item: Any):
+        """Add an item, dropping the oldest if the ring is full"""
+        self._items.append(item)
+        if not self._ready.is_set():
+            self._ready.set()
+    
+    put = put_nowait
+    
+    def get(self, block: bool = True) -> Any:
+        """Remove the oldest item, waiting for one (QueueListener.dequeue's interface)"""
+        return self.get_batch(1)[0]
+    
+    def get_batch(self, max_items: int) -> List[Any]:
+        """
+        Remove up to max_items items, waiting until at least one is available
+        
+        Args:
+            max_items: Maximum number of items returned
+            
+        Returns:
+            Items in the order they were added
+        """
+        items = self._items
+        while not items:
+            self._ready.clear()
+            # Re-check after clearing so an item added in between isn't missed
+            if items:
+                break
+            self._ready.wait()
+        
+        batch: List[Any] = []
+        try:
+            while len(batch) < max_items:
+                batch.append(items.popleft())
+        except IndexError:
+            pass
+        return batch
+
+class RingQueueHandler(QueueHandler):
+    """
+    Queue handler that passes ready records through without copying them
+    
+    QueueHandler.prepare formats every record and copies it before queuing
+    it. Records with no %-args and no exception (every structured event,
+    and most text lines) already hold their final message, so they are queued as-is.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Return the record unchanged if it needs no merging, else prepare a copy"""
+        if not record.args and not record.exc_info:
+            return record
+        return super().prepare(record)
+
+class BatchQueueListener(QueueListener):
+    """
+    Queue listener that handles records in batches of up to LOG_BATCH_SIZE
+    
+    Error records are flushed to buffered files once per batch rather than once
+    per record, so a burst of errors costs one write syscall per file.
+    """
+    
+    def __init__(self, log_queue: LogRing, *handlers: logging.Handler):
+        """
+        Initialize the listener
+        
+        Args:
+            log_queue: Ring the records are taken from
+            *handlers: Handlers the records are passed to (their levels are respected)
+        """
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self._buffered = [handler for handler in handlers if isinstance(handler, BufferedFileHandler)]
+        for handler in self._buffered:
+            handler.defer_error_flush = True
+    
+    def _monitor(self):
+        """Handle queued records in batches until the sentinel is seen"""
+        stop = False
+        while not stop:
+            for record in self.queue.get_batch(LOG_BATCH_SIZE):
+                if record is self._sentinel:
+                    stop = True
+                else:
+                    self.handle(record)
+            
+            for handler in self._buffered:
+                handler.flush_pending()
+    
 class PrometheusLogger:
     """
     Centralized logging class that manages both traditional and structured logging
+    
+    Records are queued and written to the file and console by a QueueListener
+    thread, so callers never wait on formatting or I/O.
     """
     
     def __init__(
@@ -23,7 +396,13 @@ class PrometheusLogger:
         log_file: Optional[Union[str, Path]] = None,
         console: bool = True,
         log_level: int = logging.INFO,
-        structured_enabled: bool = True
+        structured_enabled: bool = True,
+        flush_interval: float = FLUSH_INTERVAL,
+        event_format: str = "json",
+        max_bytes: int = 0,
+        backup_count: int = BACKUP_COUNT,
+        compression: Optional[str] = None,
+        console_events: bool = False
     ):
         """
         Initialize the logger
@@ -33,15 +412,46 @@ class PrometheusLogger:
             console: Whether to log to console
             log_level: Log level (default: INFO)
             structured_enabled: Whether to enable structured logging
+            flush_interval: Seconds between flushes of the log file
+            event_format: Encoding of structured events in the log file: "json"
+                (inline in the log file) or "msgpack" (a separate .events.msgpack
+                file next to it)
+            max_bytes: Size in bytes at which log files are rotated (0 never rotates)
+            backup_count: Number of rotated log files to keep
+            compression: Codec for rotated log files ("gzip", "zstd" or None)
+            console_events: Whether structured events are also printed to the console
+                (by default they only go to the log file)
         """
+        if event_format not in EVENT_FORMATS:
+            raise ValueError(f"event_format must be one of {EVENT_FORMATS}, got {event_format!r}")
+        
         self.logger = logging.getLogger("prometheus")
         self.logger.setLevel(log_level)
         self.structured_enabled = structured_enabled
         
-        # Clear any existing handlers
+        # Bind the convenience methods straight to logger.log and structured_log,
+        # skipping the extra frame through log() on every call; these instance
+        # attributes shadow the methods defined below
+        for name, level in _LEVEL_METHODS:
+            setattr(self, name, functools.partial(self.logger.log, level))
+            setattr(self, f"{name}_event", functools.partial(self.structured_log, level=level))
+        
+        # Structured events go to the log file only unless console_events is set;
+        # JSON text is only built if some handler prints it, and nothing at all
+        # is built if no handler takes events
+        console_events = console and console_events
+        self._msgpack_events = bool(log_file) and event_format == "msgpack"
+        self._json_events = (bool(log_file) and not self._msgpack_events) or console_events
+        self._events_handled = structured_enabled and (self._json_events or self._msgpack_events)
+        
+        # Clear any existing handlers, closing them so buffered records are written
         if self.logger.hasHandlers():
+            for handler in self.logger.handlers:
+                handler.close()
             self.logger.handlers.clear()
         
+        handlers: List[logging.Handler] = []
+        
         # Add file handler if log_file is provided
         if log_file:
             if isinstance(log_file, str):
@@ -50,55 +460,129 @@ class PrometheusLogger:
             # Create directory if it doesn't exist
             log_file.parent.mkdir(parents=True, exist_ok=True)
             
-            file_handler = logging.FileHandler(log_file, mode='a')
-            file_handler.setFormatter(logging.Formatter(DEFAULT_LOG_FORMAT))
-            self.logger.addHandler(file_handler)
+            file_options: Dict[str, Any] = {
+                "flush_interval": flush_interval,
+                "max_bytes": max_bytes,
+                "backup_count": backup_count,
+                "compression": compression
+            }
+            file_handler = BufferedFileHandler(log_file, mode='a', **file_options)
+            file_handler.setFormatter(FastFormatter())
+            handlers.append(file_handler)
+            
+            if self._msgpack_events:
+                file_handler.addFilter(_is_text_record)
+                handlers.append(MsgpackEventHandler(log_file.with_suffix('.events.msgpack'), **file_options))
             
         # Add console handler if requested
         if console:
             console_handler = logging.StreamHandler()
-            console_handler.setFormatter(logging.Formatter(DEFAULT_LOG_FORMAT))
-            self.logger.addHandler(console_handler)
+            console_handler.setFormatter(FastFormatter())
+            if not console_events:
+                console_handler.addFilter(_is_text_record)
+            handlers.append(console_handler)
+        
+        # The logger only enqueues; the listener thread owns the real handlers
+        self._handlers = handlers
+        self._listener: Optional[QueueListener] = None
+        if handlers:
+            log_queue = LogRing(LOG_QUEUE_SIZE)
+            self.logger.addHandler(RingQueueHandler(log_queue))
+            self._listener = BatchQueueListener(log_queue, *handlers)
+            self._listener.start()
+            atexit.register(self.close)
     
-    def log(self, msg: str, level: int = logging.INFO):
-        """Log a message using traditional logging"""
-        self.logger.log(level, msg)
+    def close(self):
+        """Write out queued records, stop the logging thread and close the handlers"""
+        if self._listener is None:
+            return
+        
+        self._listener.stop()
+        self._listener = None
+        for handler in self._handlers:
+            handler.close()
+    
+    def log(self, msg: str, level: int = logging.INFO, *args):
+        """Log a message using traditional logging (args are %-formatted only if emitted)"""
+        self.logger.log(level, msg, *args)
+    
+    def is_enabled_for(self, level: int) -> bool:
+        """Whether a message at this level would be emitted"""
+        return self.logger.isEnabledFor(level)
     
     def structured_log(self, event_type: str, data: Dict[str, Any], level: int = logging.INFO):
         """
         Log structured data with event type for better analysis
         
+        Events go to the log file (and the console only with console_events).
+        Events below the logger's level, or with no handler taking events, return
+        before the timestamp is taken or anything is encoded.
+        
         Args:
             event_type: Type of event (e.g., "order_submitted", "error", etc.)
             data: Dictionary of data to log
             level: Log level
         """
-        if not self.structured_enabled:
+        if not self._events_handled or not self.logger.isEnabledFor(level):
             return
             
+        # orjson serializes the datetime itself in C, matching datetime.isoformat();
+        # this measured faster than formatting time.time_ns() with a cached prefix
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now(),
             "event_type": event_type,
             "data": data
         }
         
-        self.logger.log(level, json.dumps(log_entry))
+        # orjson can't encode into a caller's buffer; its output goes straight into
+        # the record, and the file handler's buffer is the one reused across events
+        if self._json_events:
+            msg = orjson.dumps(log_entry, default=str, option=_ORJSON_OPTIONS).decode()
+        else:
+            msg = event_type
+        
+        # Build the record directly: Logger.log would also walk the stack to find the
+        # caller, which the log format never shows. The event attribute marks it as
+        # structured for the handler filters and carries it to the msgpack file
+        record = self.logger.makeRecord(
+            self.logger.name, level, "(unknown file)", 0, msg, (), None,
+            extra={"event": log_entry}
+        )
+        self.logger.handle(record)
     
-    # Convenience methods for different log levels
-    def debug(self, msg: str):
-        self.log(msg, logging.DEBUG)
+    def make_emitter(self, event_type: str, level: int = logging.INFO) -> Callable[[Dict[str, Any]], None]:
+        """
+        Get a function that logs one event type at one level
         
-    def info(self, msg: str):
-        self.log(msg, logging.INFO)
+        For code that emits the same event repeatedly, e.g.
+        emit_fill = logger.make_emitter("order_filled") then emit_fill(data).
+        The event is encoded whole by orjson in a single call, which measured
+        faster than splicing a pre-encoded event_type prefix around the data.
         
-    def warning(self, msg: str):
-        self.log(msg, logging.WARNING)
+        Args:
+            event_type: Type of event every call logs
+            level: Log level of the events
+            
+        Returns:
+            Function taking the event data
+        """
+        return functools.partial(self.structured_log, event_type, level=level)
+    
+    # Convenience methods for different log levels (bound per instance in __init__)
+    def debug(self, msg: str, *args):
+        self.log(msg, logging.DEBUG, *args)
         
-    def error(self, msg: str):
-        self.log(msg, logging.ERROR)
+    def info(self, msg: str, *args):
+        self.log(msg, logging.INFO, *args)
         
-    def critical(self, msg: str):
-        self.log(msg, logging.CRITICAL)
+    def warning(self, msg: str, *args):
+        self.log(msg, logging.WARNING, *args)
+        
+    def error(self, msg: str, *args):
+        self.log(msg, logging.ERROR, *args)
+        
+    def critical(self, msg: str, *args):
+        self.log(msg, logging.CRITICAL, *args)
     
     # Structured logging convenience methods
     def debug_event(self, event_type: str, data: Dict[str, Any]):
@@ -123,7 +607,13 @@ def setup_logging(
     log_file: Optional[Union[str, Path]] = 'logs/prometheus.log',
     console: bool = True,
     log_level: int = logging.INFO,
-    structured_enabled: bool = True
+    structured_enabled: bool = True,
+    flush_interval: float = FLUSH_INTERVAL,
+    event_format: str = "json",
+    max_bytes: int = 0,
+    backup_count: int = BACKUP_COUNT,
+    compression: Optional[str] = None,
+    console_events: bool = False
 ) -> PrometheusLogger:
     """
     Setup global logging configuration and return logger
@@ -133,17 +623,32 @@ def setup_logging(
         console: Whether to log to console 
         log_level: Log level
         structured_enabled: Whether to enable structured logging
+        flush_interval: Seconds between flushes of the log file
+        event_format: Encoding of structured events in the log file ("json" or "msgpack")
+        max_bytes: Size in bytes at which log files are rotated (0 never rotates)
+        backup_count: Number of rotated log files to keep
+        compression: Codec for rotated log files ("gzip", "zstd" or None)
+        console_events: Whether structured events are also printed to the console
     
     Returns:
         PrometheusLogger instance
     """
     global _default_logger
+    if _default_logger is not None:
+        _default_logger.close()
     _default_logger = PrometheusLogger(
         log_file=log_file,
         console=console,
         log_level=log_level,
-        structured_enabled=structured_enabled
+        structured_enabled=structured_enabled,
+        flush_interval=flush_interval,
+        event_format=event_format,
+        max_bytes=max_bytes,
+        backup_count=backup_count,
+        compression=compression,
+        console_events=console_events
     )
+    _bind_module_functions(_default_logger)
     return _default_logger
 
 def get_logger() -> PrometheusLogger:
@@ -158,27 +663,53 @@ def get_logger() -> PrometheusLogger:
         _default_logger = setup_logging()
     return _default_logger
 
-# Convenience functions for direct access without getting logger instance
-def log(msg: str, level: int = logging.INFO):
-    get_logger().log(msg, level)
+# Module-level functions rebound to the default logger's methods by setup_logging
+_MODULE_FUNCTIONS = (
+    "log", "is_enabled_for", "structured_log",
+    "debug", "info", "warning", "error", "critical",
+    "debug_event", "info_event", "warning_event", "error_event", "critical_event"
+)
+
+def _bind_module_functions(logger: PrometheusLogger):
+    """
+    Point the module-level convenience functions at a logger's bound methods
+    
+    Callers use them as log.info(...), looking the name up on this module each
+    time, so after binding a call goes straight to the logger without passing
+    through get_logger().
+    
+    Args:
+        logger: Logger whose methods the functions become
+    """
+    module_globals = globals()
+    for name in _MODULE_FUNCTIONS:
+        module_globals[name] = getattr(logger, name)
+
+# Convenience functions for direct access without getting logger instance; these
+# definitions only run until the first setup_logging() call replaces them
+def log(msg: str, level: int = logging.INFO, *args):
+    get_logger().log(msg, level, *args)
+
+def is_enabled_for(level: int) -> bool:
+    return get_logger().is_enabled_for(level)
 
 def structured_log(event_type: str, data: Dict[str, Any], level: int = logging.INFO):
     get_logger().structured_log(event_type, data, level)
 
-def debug(msg: str):
-    get_logger().debug(msg)
+def debug(msg: str, *args):
+    get_logger().debug(msg, *args)
     
-def info(msg: str):
-    get_logger().info(msg)
+def info(msg: str, *args):
+    get_logger().info(msg, *args)
     
-def warning(msg: str):
-    get_logger().warning(msg)
+def warning(msg: str, *args):
+    get_logger().warning(msg, *args)
     
-def error(msg: str):
-    get_logger().error(msg)
+def error(msg: str, *args):
+    get_logger().error(msg, *args)
     
-def critical(msg: str):
-    get_logger().critical(msg)
+def critical(msg: str, *args):
+    get_logger().critical(msg, *args)
 
 def debug_event(event_type: str, data: Dict[str, Any]):
     get_logger().debug_event(event_type, data)
@@ -0,0 +1,55 @@
+"""
+Prometheus Trading Bot - Timeframe Utilities
+
+Helpers for turning a bar count and timeframe into a request window
+"""
+
+import math
+import re
+from typing import Optional
+
+import pandas as pd
+
+# Timeframe strings as used across the bot and the Alpaca API (1Min, 15Min, 1H, 1Hour, 1D, 1Day, ...)
+_TIMEFRAME_PATTERN = re.compile(r"^(\d+)\s*(Min|T|H|Hour|D|Day|W|Week|M|Month)$")
+
+# Minutes per bar for intraday units, trading sessions per bar for the rest
+_INTRADAY_MINUTES = {"Min": 1, "T": 1, "H": 60, "Hour": 60}
+_SESSIONS_PER_BAR = {"D": 1, "Day": 1, "W": 5, "Week": 5, "M": 21, "Month": 21}
+
+REGULAR_SESSION_MINUTES = 390  # 9:30-16:00 ET; extended hours only add bars, so this is conservative
+HOLIDAY_SLACK = 1.1  # Extra calendar span for market holidays
+WEEKEND_SLACK_DAYS = 3  # Covers a long weekend before the current session
+
+
+def lookback_start(timeframe: str, bars: int, end: Optional[str] = None) -> Optional[str]:
+    """
+    Start of a window that holds at least the given number of bars
+    
+    Counts regular-session bars only and adds room for weekends and holidays,
+    so the window is usually somewhat larger than needed; callers keep the
+    newest bars they asked for.
+    
+    Args:
+        timeframe: Bar timeframe (e.g. 1Min, 15Min, 1H, 1D)
+        bars: Number of bars the window has to cover
+        end: End of the window in ISO format (defaults to now)
+    
+    Returns:
+        ISO 8601 start time, or None if the timeframe isn't recognized
+    """
+    match = _TIMEFRAME_PATTERN.match(timeframe)
+    if not match or bars <= 0:
+        return None
+    
+    count, unit = int(match.group(1)), match.group(2)
+    if unit in _INTRADAY_MINUTES:
+        sessions = math.ceil(bars * count * _INTRADAY_MINUTES[unit] / REGULAR_SESSION_MINUTES)
+    else:
+        sessions = bars * count * _SESSIONS_PER_BAR[unit]
+    
+    days = math.ceil(sessions * 7 / 5 * HOLIDAY_SLACK) + WEEKEND_SLACK_DAYS
+    anchor = pd.Timestamp(end) if end else pd.Timestamp.now(tz="UTC")
+    if anchor.tzinfo is None:
+        anchor = anchor.tz_localize("UTC")
+    return (anchor - pd.Timedelta(days=days)).isoformat()
@@ -0,0 +1,102 @@
+"""
+Tests for multi-symbol bar paging in the Alpaca client
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pandas as pd
+
+from src.api.alpaca import AlpacaClient
+
+
+def _bars(count, first_minute=0, price=100.0):
+    """Build raw API bars one minute apart"""
+    return [
+        {
+            "t": f"2024-01-02T15:{first_minute + i:02d}:00Z",
+            "o": price + i, "h": price + i, "l": price + i, "c": price + i, "v": 10 + i
+        }
+        for i in range(count)
+    ]
+
+
+def _client_with_pages(pages):
+    """Client whose HTTP layer returns the given pages and records each request's params"""
+    client = AlpacaClient(api_key="k", api_secret="s")
+    sent = []
+
+    async def fake_request(method, url, params=None, json=None):
+        sent.append(dict(params))
+        return pages[len(sent) - 1]
+
+    client._request = AsyncMock(side_effect=fake_request)
+    return client, sent
+
+
+def test_symbol_after_full_first_page_is_not_starved():
+    # Symbol A fills the first page entirely; B only arrives on the next one
+    pages = [
+        {"bars": {"A": _bars(6)}, "next_page_token": "p2"},
+        {"bars": {"A": _bars(2, first_minute=6, price=106.0), "B": _bars(5, price=200.0)}, "next_page_token": None},
+    ]
+    client, sent = _client_with_pages(pages)
+
+    bars = asyncio.run(client.get_bars_arrays(["A", "B"], timeframe="1Min", limit=3))
+
+    assert set(bars) == {"A", "B"}
+    assert list(bars["A"]["close"]) == [105.0, 106.0, 107.0]
+    assert list(bars["B"]["close"]) == [202.0, 203.0, 204.0]
+    assert bars["B"]["timestamp"][-1] == pd.Timestamp("2024-01-02 15:04:00").to_datetime64()
+
+    assert len(sent) == 2
+    assert sent[1]["page_token"] == "p2"
+    assert sent[0]["limit"] == 6
+
+
+def test_window_start_is_bounded_by_lookback():
+    client, sent = _client_with_pages([{"bars": {"A": _bars(3)}, "next_page_token": None}])
+    end = "2024-01-02T21:00:00+00:00"
+
+    asyncio.run(client.get_bars_arrays(["A"], timeframe="1Min", limit=3, end=end))
+
+    start = pd.Timestamp(sent[0]["start"])
+    assert start < pd.Timestamp(end)
+    assert pd.Timestamp(end) - start < pd.Timedelta(days=7)
+
+
+def test_explicit_start_is_kept():
+    client, sent = _client_with_pages([{"bars": {}, "next_page_token": None}])
+
+    bars = asyncio.run(client.get_bars_arrays(["A"], limit=3, start="2024-01-02T00:00:00Z"))
+
+    assert bars == {}
+    assert sent[0]["start"] == "2024-01-02T00:00:00Z"
+
+
+def test_incremental_cold_symbols_each_get_lookback():
+    pages = [
+        {"bars": {"A": _bars(6)}, "next_page_token": "p2"},
+        {"bars": {"B": _bars(4, price=200.0)}, "next_page_token": None},
+    ]
+    client, sent = _client_with_pages(pages)
+
+    bars = asyncio.run(client.get_bars_incremental(["A", "B"], timeframe="1Min", lookback=4))
+
+    assert len(bars["A"]) == 4
+    assert len(bars["B"]) == 4
+    assert "start" in sent[0]
+
+
+def test_incremental_warm_start_is_bounded_by_lookback():
+    client, sent = _client_with_pages([{"bars": {}, "next_page_token": None}])
+    stale = _bars(3)
+    client._bars[("A", "1Min")] = pd.DataFrame(
+        {"close": [b["c"] for b in stale]},
+        index=pd.DatetimeIndex([b["t"] for b in stale], name="timestamp")
+    )
+
+    asyncio.run(client.get_bars_incremental(["A"], timeframe="1Min", lookback=3))
+
+    assert pd.Timestamp(sent[0]["start"]) > pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=7)
+    assert sent[0]["limit"] == 3
@@ -0,0 +1,43 @@
+"""
+Tests for the strategy kernels against the NumPy code paths they replace
+"""
+
+import numpy as np
+
+from src.bot import _kernels, strategy
+from src.bot.strategy import moving_average
+
+
+CLOSES = np.array([1.0, 2.0, np.nan, 4.0, 5.0, 6.0, 7.0, np.inf, 9.0, 10.0, 11.0, 12.0])
+
+
+def _convolve_average(values, window, monkeypatch):
+    """moving_average with the optional backends switched off"""
+    monkeypatch.setattr(strategy, "bn", None)
+    monkeypatch.setattr(_kernels, "HAVE_NUMBA", False)
+    return moving_average(values, window)
+
+
+def test_sma_matches_convolve_on_non_finite_input(monkeypatch):
+    for window in (1, 2, 3, 5):
+        expected = _convolve_average(CLOSES, window, monkeypatch)
+        np.testing.assert_allclose(_kernels.sma(CLOSES, window), expected, equal_nan=True)
+
+
+def test_sma_recovers_after_nan_leaves_the_window():
+    result = _kernels.sma(np.array([1.0, 2.0, np.nan, 4.0, 5.0, 6.0, 7.0, 8.0]), 2)
+
+    np.testing.assert_allclose(result, [np.nan, 1.5, np.nan, np.nan, 4.5, 5.5, 6.5, 7.5], equal_nan=True)
+
+
+def test_tail_averages_match_slices_with_nan_last_close():
+    close = np.array([1.0, 2.0, 3.0, 4.0, 5.0, np.nan])
+    short, long = 2, 4
+
+    expected = (
+        close[-short - 1:-1].mean(),
+        close[-long - 1:-1].mean(),
+        close[-short:].mean(),
+        close[-long:].mean()
+    )
+    np.testing.assert_allclose(_kernels.tail_averages(close, short, long), expected, equal_nan=True)
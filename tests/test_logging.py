@@ -0,0 +1,51 @@
+"""
+Tests for the buffered log file handlers and event encoding
+"""
+
+import logging
+import os
+from datetime import datetime
+
+import numpy as np
+
+from src.utils.logging import BufferedFileHandler, _msgpack_default
+
+
+def _record(message, level=logging.INFO):
+    """Build a log record with the given message"""
+    return logging.LogRecord("test", level, __file__, 1, message, None, None)
+
+
+def test_rotation_does_not_flush_every_record(tmp_path):
+    path = tmp_path / "bot.log"
+    handler = BufferedFileHandler(path, flush_interval=60, max_bytes=1024 * 1024)
+    try:
+        handler.emit(_record("buffered line"))
+        assert os.path.getsize(path) == 0
+
+        handler.flush()
+        assert os.path.getsize(path) == len("buffered line\n")
+    finally:
+        handler.close()
+
+
+def test_rotation_counts_bytes_across_reopen_and_rollover(tmp_path):
+    path = tmp_path / "bot.log"
+    path.write_text("x" * 90)
+    handler = BufferedFileHandler(path, flush_interval=60, max_bytes=100, backup_count=1)
+    try:
+        # The existing 90 bytes count toward the limit, so this record rotates the file
+        handler.emit(_record("héllo wörld"))
+        assert os.path.getsize(f"{path}.1") == 90 + len("héllo wörld\n".encode(handler.stream.encoding))
+
+        handler.emit(_record("after"))
+        handler.flush()
+        assert path.read_text() == "after\n"
+    finally:
+        handler.close()
+
+
+def test_msgpack_default_converts_numpy_values():
+    assert _msgpack_default(np.array([[1.5, 2.0], [3.0, 4.0]])) == [[1.5, 2.0], [3.0, 4.0]]
+    assert _msgpack_default(np.float64(1.5)) == 1.5
+    assert _msgpack_default(datetime(2024, 1, 2, 15, 30)) == "2024-01-02T15:30:00"
@@ -0,0 +1,43 @@
+"""
+Tests for MAStrategy moving averages and signals
+"""
+
+import asyncio
+
+import numpy as np
+
+from src.bot.strategy import MAStrategy
+from src.data.provider import Bars
+
+
+def _bars(closes):
+    """Build one-minute Bars with the given closes"""
+    closes = np.asarray(closes, dtype=np.float64)
+    ts = np.datetime64("2024-01-02T15:00", "ns") + np.arange(len(closes)) * np.timedelta64(1, "m")
+    return Bars(ts, closes, closes, closes, closes, np.ones(len(closes), dtype=np.int64))
+
+
+def test_nan_close_does_not_poison_moving_averages():
+    strategy = MAStrategy(short_window=2, long_window=3)
+    closes = [1.0, 2.0, 3.0, 4.0, 5.0]
+    strategy._update_state("A", _bars(closes))
+
+    # A NaN close followed by a finite one, so the last close still lines up next tick
+    closes += [np.nan, 6.0]
+    strategy._update_state("A", _bars(closes))
+
+    for close in (7.0, 8.0, 9.0):
+        closes.append(close)
+        state = strategy._update_state("A", _bars(closes))
+
+    assert state["current_short_ma"] == 8.5
+    assert state["current_long_ma"] == 8.0
+    assert state["prev_long_ma"] == 7.0
+
+
+def test_batch_null_signals_are_independent():
+    strategy = MAStrategy(short_window=2, long_window=3)
+    signals = asyncio.run(strategy.analyze_batch({"A": _bars([1.0]), "B": _bars([2.0])}))
+
+    signals["A"]["reason"] = "too little history"
+    assert signals["B"] == {"action": None}
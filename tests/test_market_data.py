@@ -0,0 +1,106 @@
+"""
+Tests for MarketDataFetcher caching, feed preferences and concurrent scans
+"""
+
+import asyncio
+import time
+from pathlib import Path
+
+import numpy as np
+import orjson
+import pandas as pd
+import pytest
+
+pytest.importorskip("alpaca_trade_api")
+pytest.importorskip("requests")
+
+from src.utils.data import MarketDataFetcher  # noqa: E402
+
+
+def _frame(count, end="2024-01-02 20:00", freq="1min", start_price=100.0):
+    """Build a bar DataFrame with a UTC index ending at end"""
+    end = pd.Timestamp(end)
+    end = end.tz_localize("UTC") if end.tzinfo is None else end
+    index = pd.date_range(end=end, periods=count, freq=freq, name="timestamp")
+    prices = start_price + np.arange(count, dtype=np.float64)
+    return pd.DataFrame(
+        {"open": prices, "high": prices, "low": prices, "close": prices, "volume": np.ones(count)},
+        index=index
+    )
+
+
+class ScanClient:
+    """Client for concurrent scans: the sip feed has no bars for every other symbol"""
+
+    def get_bars(self, symbol, timeframe, limit, feed=None, **kwargs):
+        time.sleep(0.001)  # Let the worker threads interleave
+        if feed == "sip" and int(symbol[1:]) % 2:
+            return None
+        return _frame(limit)
+
+
+class ExchangeClient:
+    """Client serving an ordered bar history the way the API does: oldest limit bars after start"""
+
+    def __init__(self, history):
+        self.history = history
+        self.requests = []
+
+    def get_bars(self, symbol, timeframe, limit, feed=None, start=None, **kwargs):
+        self.requests.append({"limit": limit, "start": start})
+        bars = self.history
+        if start:
+            bars = bars[bars.index >= pd.Timestamp(start)]
+        return bars.iloc[:limit]
+
+
+def test_refresh_after_idle_gap_returns_newest_bars():
+    # The cache was filled ten days ago; since then the exchange has printed 3000 bars
+    now = pd.Timestamp.now(tz="UTC").floor("min")
+    history = _frame(3000, end=now)
+    client = ExchangeClient(history)
+    fetcher = MarketDataFetcher(client, feed_preferences_file=None)
+    fetcher._cache[("A", "1Min")] = (time.monotonic() - 3600, "sip", _frame(5, end=now - pd.Timedelta(days=10)))
+
+    bars = fetcher.get_bars("A", lookback_bars=5, timeframe="1Min")
+
+    assert list(bars.index) == list(history.index[-5:])
+    assert pd.Timestamp(client.requests[0]["start"]) > now - pd.Timedelta(days=10)
+
+
+def test_full_refresh_delta_falls_back_to_full_fetch(monkeypatch):
+    monkeypatch.setattr("src.utils.data.MAX_BARS_PER_REQUEST", 100)
+    now = pd.Timestamp.now(tz="UTC").floor("min")
+    history = _frame(3000, end=now)
+    client = ExchangeClient(history)
+    fetcher = MarketDataFetcher(client, feed_preferences_file=None)
+    fetcher._cache[("A", "1Min")] = (time.monotonic() - 3600, "sip", _frame(5, end=now - pd.Timedelta(days=1)))
+
+    assert fetcher._get_cached_bars("A", "1Min", 5) is None
+
+
+def test_concurrent_scan_keeps_shared_state_consistent(tmp_path, monkeypatch):
+    prefs_file = tmp_path / "feed_preferences.json"
+    fetcher = MarketDataFetcher(ScanClient(), feed_preferences_file=prefs_file)
+
+    writes = []
+    write_bytes = Path.write_bytes
+    monkeypatch.setattr(Path, "write_bytes", lambda self, data: writes.append(self) or write_bytes(self, data))
+
+    symbols = [f"S{i}" for i in range(200)]
+    frames = asyncio.run(fetcher.get_bars_many_async(symbols, lookback_bars=5, timeframe="1Min"))
+
+    assert set(frames) == set(symbols)
+    stats = fetcher.data_stats
+    assert stats["attempts"] == 200
+    assert stats["successes"] == 200
+    assert stats["feed_successes"]["sip"] == 100
+    assert stats["feed_successes"]["default"] == 100
+
+    # Preferences are written once, after the scan, and read back intact
+    assert len(writes) == 1
+    stored = orjson.loads(prefs_file.read_bytes())
+    assert len(stored) == 200
+    assert stored["S0/1Min"] == "sip"
+    assert stored["S1/1Min"] is None
+    assert MarketDataFetcher(ScanClient(), feed_preferences_file=prefs_file)._preferred_feed == fetcher._preferred_feed